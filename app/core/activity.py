@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import on_configure, settings
+from app.repositories.activity import write_entries
+
+# Write-behind activity log: who changed what in a project. Handlers call
+# `await activity_log.record(...)`, which only puts the entry on a bounded in-process
+# queue; a background flusher, started with the app, writes the queue to project_activity
+# in multi-row INSERTs of up to ACTIVITY_BATCH_SIZE entries, at the latest
+# ACTIVITY_FLUSH_SECONDS after the first entry of a batch. When the database falls
+# behind the queue fills up and record() waits for room (backpressure), for at most
+# ACTIVITY_ENQUEUE_TIMEOUT_SECONDS: after that the entry is dropped and counted, so a
+# stalled flusher slows writes down without failing them.
+#
+# Entries still queued at shutdown are written then; a worker that dies loses its queue.
+# Without a running flusher (scripts, benchmarks) record() does nothing.
+
+activity_logger = logging.getLogger("app.activity")
+
+# a failing batch is retried after 1s, 2s, ... and dropped after the last attempt
+WRITE_ATTEMPTS = 4
+
+
+@dataclass
+class ActivityEntry:
+    type: str
+    actor_id: int
+    project_id: Optional[int] = None
+    # entries about a whole team (a new member) go to every project of the team
+    team_id: Optional[int] = None
+    task_id: Optional[int] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class ActivityLog:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.written = 0
+        self.dropped = 0
+        self._queue: "Optional[asyncio.Queue[ActivityEntry]]" = None
+        # the batch being collected or written, so stop() can still write it
+        self._batch: List[ActivityEntry] = []
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def record(
+        self,
+        type: str,
+        actor_id: int,
+        project_id: Optional[int] = None,
+        *,
+        team_id: Optional[int] = None,
+        task_id: Optional[int] = None,
+        **data: Any,
+    ) -> None:
+        if self._queue is None:
+            return
+        entry = ActivityEntry(type, actor_id, project_id, team_id, task_id, data)
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(entry), settings.ACTIVITY_ENQUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                activity_logger.warning("activity queue full, dropped a %s entry", type)
+
+    def start(self) -> None:
+        if self._flusher is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._flusher = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._flusher is None:
+            return
+        queue, self._queue = self._queue, None
+        self._flusher.cancel()
+        await asyncio.gather(self._flusher, return_exceptions=True)
+        self._flusher = None
+        pending, self._batch = self._batch, []
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+        if pending:
+            await self._write(pending)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch = [await self._queue.get()]
+            deadline = loop.time() + settings.ACTIVITY_FLUSH_SECONDS
+            while len(self._batch) < settings.ACTIVITY_BATCH_SIZE:
+                try:
+                    self._batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(self._batch)
+            self._batch = []
+
+    async def _write(self, entries: List[ActivityEntry]) -> None:
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                await write_entries(entries)
+                self.written += len(entries)
+                return
+            except Exception:
+                activity_logger.exception("writing %d activity entries failed", len(entries))
+                if attempt + 1 < WRITE_ATTEMPTS:
+                    await asyncio.sleep(2 ** attempt)
+        self.dropped += len(entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+activity_log = ActivityLog(settings.ACTIVITY_QUEUE_SIZE)
+
+@on_configure
+def _configure() -> None:
+    # the queue is created by start(), at startup
+    activity_log.queue_size = settings.ACTIVITY_QUEUE_SIZE
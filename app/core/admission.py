@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from jose import jwt
+from jose.exceptions import JOSEError
+from starlette.responses import JSONResponse
+
+from app.core.config import on_configure, settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional, only needed for RATE_LIMIT_BACKEND=redis
+    redis = None
+
+# Admission control, in front of everything else: a request is first charged to a token
+# bucket (its user's when it carries a valid token, its client IP's otherwise) and gets a
+# 429 when the bucket is empty. It then takes a slot in its route class (lane): auth,
+# heavy_reads or writes, each with a cap on concurrent requests. When a lane is full,
+# requests wait in a short bounded queue and get a 503 once it is full or they time out,
+# rather than queueing without bound. Both responses carry Retry-After. Cheap reads
+# (single entities) and long-lived streams are only rate limited.
+
+admission_log = logging.getLogger("app.admission")
+
+AUTH, HEAVY_READS, WRITES = "auth", "heavy_reads", "writes"
+
+_AUTH_PATHS = ("/auth/login", "/auth/register")
+# held open for as long as the client listens
+_STREAM_PATHS = ("/events/stream",)
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    path = path[len(settings.API_V1_STR):] if path.startswith(settings.API_V1_STR) else path
+    if path.startswith(_STREAM_PATHS):
+        return None
+    if path.rstrip("/") in _AUTH_PATHS:
+        return AUTH
+    if method not in ("GET", "HEAD"):
+        return WRITES
+    # collections (/tasks/, /comments/, /search/, ...) and exports
+    if path.endswith("/") or path.endswith("/export"):
+        return HEAVY_READS
+    return None
+
+
+# in-process buckets, LRU bounded; each worker limits on its own
+class MemoryBuckets:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int, cost: int) -> float:
+        """Take `cost` tokens; returns 0 when admitted, else the seconds until there are enough."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# the same bucket in a Redis hash, updated atomically by a script on the server's clock
+_TAKE_SCRIPT = """
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+class RedisBuckets:
+    def __init__(self, url: str, prefix: str = "rate-limit:"):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package")
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: int, cost: int) -> float:
+        return float(await self._take(keys=[self.prefix + key], args=[rate, burst, cost]))
+
+
+class Lane:
+    """A cap on concurrent requests with a bounded, time-limited queue in front of it."""
+
+    def __init__(self, name: str, limit: int, max_waiting: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(limit)
+
+    async def enter(self) -> bool:
+        if self._slots.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return True
+
+    def leave(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+
+class AdmissionControl:
+    def __init__(self, buckets, lanes: Dict[str, Lane]):
+        self.configure(buckets, lanes)
+        # rejected by the token buckets, by bucket kind ("user", "ip")
+        self.rate_limited: Dict[str, int] = {"user": 0, "ip": 0}
+
+    def configure(self, buckets, lanes: Dict[str, Lane]) -> None:
+        self.buckets = buckets
+        self.lanes = lanes
+
+    def _bucket(self, scope) -> Tuple[str, float, int]:
+        # only a valid token selects the user's bucket, a forged one is charged to its IP
+        headers = dict(scope.get("headers") or ())
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                subject = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+            except JOSEError:
+                subject = None
+            if subject is not None:
+                return f"user:{subject}", settings.RATE_LIMIT_USER_PER_SECOND, settings.RATE_LIMIT_USER_BURST
+        # the connecting address; run behind a proxy with --proxy-headers
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}", settings.RATE_LIMIT_IP_PER_SECOND, settings.RATE_LIMIT_IP_BURST
+
+    async def rate_limit_wait(self, scope, lane: Optional[str]) -> float:
+        key, rate, burst = self._bucket(scope)
+        cost = settings.RATE_LIMIT_AUTH_COST if lane == AUTH else 1
+        try:
+            wait = await self.buckets.take(key, rate, burst, cost)
+        except Exception:
+            # an unreachable shared backend must not take the API down with it
+            admission_log.exception("rate limit backend failed, admitting")
+            return 0.0
+        if wait:
+            self.rate_limited[key.split(":", 1)[0]] += 1
+        return wait
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "lanes": {
+                name: {"limit": lane.limit, "in_flight": lane.in_flight, "waiting": lane.waiting, "rejected": lane.rejected}
+                for name, lane in self.lanes.items()
+            },
+            "rate_limited": dict(self.rate_limited),
+        }
+
+
+def _buckets():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBuckets(settings.RATE_LIMIT_URL)
+    return MemoryBuckets(settings.AUTH_CACHE_SIZE)
+
+def _lane(name: str, limit: int) -> Lane:
+    return Lane(name, limit, settings.ADMISSION_QUEUE_SIZE, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS)
+
+def _lanes() -> Dict[str, Lane]:
+    return {
+        AUTH: _lane(AUTH, settings.CONCURRENCY_AUTH),
+        HEAVY_READS: _lane(HEAVY_READS, settings.CONCURRENCY_HEAVY_READS),
+        WRITES: _lane(WRITES, settings.CONCURRENCY_WRITES),
+    }
+
+admission = AdmissionControl(_buckets(), _lanes())
+
+@on_configure
+def _configure() -> None:
+    admission.configure(_buckets(), _lanes())
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, control: AdmissionControl = admission):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        lane_name = route_class(scope["method"], scope["path"])
+        wait = await self.control.rate_limit_wait(scope, lane_name)
+        if wait:
+            response = JSONResponse(
+                {"detail": "Too many requests"}, status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+            return await response(scope, receive, send)
+
+        lane = self.control.lanes.get(lane_name)
+        if lane is None:
+            return await self.app(scope, receive, send)
+        if not await lane.enter():
+            response = JSONResponse(
+                {"detail": "Server busy, try again shortly"}, status_code=503,
+                headers={"Retry-After": str(math.ceil(lane.timeout))},
+            )
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.leave()
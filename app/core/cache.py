@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from app.core.config import on_configure, settings
+
+MISSING = object()
+
+
+# bounded LRU whose entries expire ttl seconds after being set
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def configure(self, maxsize: int, ttl: float) -> None:
+        # entries set under the old ttl go too
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data.clear()
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [key for key in self._data if predicate(key)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# user_id -> detached User
+user_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+# (user_id, team_id) -> role, or None when the user is not a member
+membership_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+# memberships changed within the replica lag window: a replica may still return the old
+# role, so lookups of these keys are not cached (see cache_membership)
+_changed_memberships = TTLCache(settings.AUTH_CACHE_SIZE, settings.REPLICA_MAX_LAG_SECONDS)
+
+@on_configure
+def _configure() -> None:
+    for cache in (user_cache, membership_cache):
+        cache.configure(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+    _changed_memberships.configure(settings.AUTH_CACHE_SIZE, settings.REPLICA_MAX_LAG_SECONDS)
+
+def cache_membership(user_id: int, team_id: int, role) -> None:
+    if _changed_memberships.get((user_id, team_id)) is MISSING:
+        membership_cache.set((user_id, team_id), role)
+
+def invalidate_membership(user_id: int, team_id: int) -> None:
+    membership_cache.invalidate((user_id, team_id))
+    _changed_memberships.set((user_id, team_id), True)
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.invalidate(user_id)
+    membership_cache.invalidate_where(lambda key: key[0] == user_id)
+
+def invalidate_team(team_id: int) -> None:
+    membership_cache.invalidate_where(lambda key: key[1] == team_id)
+
+def auth_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {"users": user_cache.stats(), "memberships": membership_cache.stats()}
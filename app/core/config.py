@@ -1,6 +1,5 @@
 from pydantic import BaseSettings
-from typing import List
-from functools import lru_cache
+from typing import Callable, List, Optional
 
 class Settings(BaseSettings):
     #App settings
@@ -13,8 +12,98 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
-    #Database
+    #Password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 100
+
+    #Auth cache (users and team memberships)
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL: int = 60
+
+    #Change feed
+    EVENT_QUEUE_SIZE: int = 100
+    EVENT_HISTORY_SIZE: int = 1000
+    EVENT_HEARTBEAT_SECONDS: int = 15
+
+    #Response cache (list endpoints); backend is "memory" or "redis"
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_URL: str = "redis://localhost:6379/0"
+    RESPONSE_CACHE_SIZE: int = 5000
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_TTL: int = 300
+
+    #Serialization: list endpoints select plain columns and encode with orjson
+    FAST_SERIALIZATION: bool = False
+
+    #Admission control: token buckets per user (valid token) or client IP, and caps on
+    #concurrent requests per route class; backend is "memory" (per worker) or "redis"
+    #(shared by the workers of a host)
+    ADMISSION_CONTROL: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_URL: str = "redis://localhost:6379/1"
+    RATE_LIMIT_USER_PER_SECOND: float = 20
+    RATE_LIMIT_USER_BURST: int = 60
+    RATE_LIMIT_IP_PER_SECOND: float = 10
+    RATE_LIMIT_IP_BURST: int = 30
+    # login and register hash a password, so they cost this many tokens
+    RATE_LIMIT_AUTH_COST: int = 5
+    CONCURRENCY_AUTH: int = 8
+    CONCURRENCY_HEAVY_READS: int = 16
+    CONCURRENCY_WRITES: int = 32
+    # requests beyond a cap wait in a short queue, or get a 503 when it is full or they time out
+    ADMISSION_QUEUE_SIZE: int = 32
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 1.0
+
+    #Deletes: trees with more tasks than the threshold are deleted in the background, in chunks
+    DELETE_CHUNK_SIZE: int = 1000
+    DELETE_BACKGROUND_THRESHOLD: int = 5000
+    JOB_HISTORY_SIZE: int = 1000
+
+    #Activity log, written behind the requests that record it (app/core/activity.py)
+    ACTIVITY_LOG: bool = True
+    ACTIVITY_QUEUE_SIZE: int = 10000
+    ACTIVITY_BATCH_SIZE: int = 500
+    ACTIVITY_FLUSH_SECONDS: float = 1.0
+    # how long a request waits for room in a full queue before its entry is dropped
+    ACTIVITY_ENQUEUE_TIMEOUT_SECONDS: float = 0.5
+
+    #Due dates: a "task.due_soon" event DUE_REMINDER_MINUTES before a task is due, and the
+    #overdue flag (and a "task.overdue" event) once it is; see app/core/scheduler.py
+    DUE_SCHEDULER: bool = True
+    DUE_REMINDER_MINUTES: int = 60
+    # notices due within this window are kept in memory, and the window rescanned this often
+    DUE_LOOKAHEAD_SECONDS: int = 600
+    DUE_RESCAN_SECONDS: int = 60
+    # on (re)start, tasks that came due this long ago and were missed are still flagged
+    DUE_CATCHUP_HOURS: int = 24
+    DUE_BATCH_SIZE: int = 1000
+    DUE_LEADER_RETRY_SECONDS: int = 30
+
+    #Archival: done tasks untouched for this many days move to the archive tables (unset: never)
+    ARCHIVE_AFTER_DAYS: Optional[int] = None
+    ARCHIVE_BATCH_SIZE: int = 1000
+    ARCHIVE_INTERVAL_SECONDS: int = 3600
+
+    #Project import: tasks inserted (and committed) per batch
+    IMPORT_BATCH_SIZE: int = 500
+
+    #Database; GET/HEAD requests read from the replicas, if any (a JSON list in the environment)
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: List[str] = []
+    # replicas lagging further behind are skipped, and users read from the primary
+    # for this long after a write (read-your-writes)
+    REPLICA_MAX_LAG_SECONDS: int = 5
+    REPLICA_HEALTH_CHECK_SECONDS: int = 10
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    # connections opened per engine at startup, so the first requests do not pay for them
+    DB_POOL_WARMUP: int = 0
+    # log statements slower than this many milliseconds (unset: no slow query log)
+    SLOW_QUERY_MS: Optional[int] = None
 
     #Optional settings
     CORS_ORIGINS: List[str] = ["*"]
@@ -24,8 +113,43 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
-@lru_cache()
+_settings: Optional[Settings] = None
+# see on_configure
+_appliers: List[Callable[[], None]] = []
+
 def get_settings() -> Settings:
-    return Settings()
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+def configure(new_settings: Settings) -> None:
+    """Use these settings rather than the environment's (see app.main.create_app).
+
+    Modules imported before this call re-apply them through their on_configure hooks.
+    """
+    global _settings
+    _settings = new_settings
+    for apply in _appliers:
+        apply()
+
+def on_configure(apply: Callable[[], None]) -> Callable[[], None]:
+    """Register a module's hook that re-reads the settings its singletons were built from.
+
+    Caches, pools and queues are built from the settings when their module is imported;
+    configure() runs the hook so they follow settings configured after that import.
+    """
+    _appliers.append(apply)
+    return apply
+
+
+# `settings.X` reads the configured settings, so importing this module does not build
+# (and validate) them from the environment until something first needs a value
+class _LazySettings:
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(get_settings(), name, value)
 
-settings = get_settings()
+settings = _LazySettings()
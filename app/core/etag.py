@@ -0,0 +1,51 @@
+import hashlib
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy.orm.exc import StaleDataError
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def row_etag(row) -> str:
+    # every versioned model bumps `version` on update, so (id, version) names one state of the row;
+    # sparse (fields=) and full representations share it, so either can be used for If-Match
+    return make_etag(row.id, row.version)
+
+def collection_etag(rows: Iterable, next_cursor: Optional[str] = None) -> str:
+    # a page changes when any row in it changes, or when rows enter or leave it; rows may be
+    # entities or column tuples, and comments are never updated so they carry no version
+    return make_etag([(row.id, getattr(row, "version", None)) for row in rows], next_cursor)
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    # weak comparison (RFC 9110 8.8.3.2): all our tags are weak, including for If-Match
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(_opaque(candidate) == _opaque(etag) for candidate in header.split(","))
+
+def not_modified(etag: str) -> Response:
+    # returned as-is by the route, so the body is never serialized
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+def check_if_match(if_match: Optional[str], etag: str) -> None:
+    if if_match is not None and not etag_matches(if_match, etag):
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Resource has been modified")
+
+@contextmanager
+def versioned_write(if_match: Optional[str]):
+    # the ORM update is guarded by the version it loaded; another writer got in between
+    try:
+        yield
+    except StaleDataError:
+        if if_match is not None:
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Resource has been modified")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Resource was modified concurrently, retry")
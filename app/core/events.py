@@ -0,0 +1,125 @@
+import asyncio
+import itertools
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from app.core.config import on_configure, settings
+
+# In-process change feed. Mutation handlers publish events to topics such as
+# "project:1" and "task:7"; every subscriber gets its own bounded queue. A subscriber
+# whose queue fills up is dropped and can reconnect with the last event id it saw:
+# recent events are replayed from a bounded history, older gaps ask it to resync.
+# Event ids are only meaningful within one worker process.
+
+
+@dataclass
+class Event:
+    id: int
+    type: str
+    topics: List[str]
+    data: Dict[str, Any]
+
+
+RESYNC = "resync"
+
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", topic: str, queue_size: int):
+        self.topic = topic
+        self.dropped = False
+        self._broker = broker
+        self._queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, event: Event) -> None:
+        if self.dropped:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            self._broker.dropped_subscribers += 1
+            self._broker.unsubscribe(self)
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        # None means nothing arrived within timeout, or the subscriber was dropped and drained
+        if self.dropped and self._queue.empty():
+            return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+
+class EventBroker:
+    def __init__(self, queue_size: int, history_size: int):
+        self.queue_size = queue_size
+        self.dropped_subscribers = 0
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def configure(self, queue_size: int, history_size: int) -> None:
+        # for subscriptions made from now on; the newest history is kept
+        self.queue_size = queue_size
+        self._history = deque(self._history, maxlen=history_size)
+
+    def publish(self, topics: List[str], type: str, data: Dict[str, Any]) -> Event:
+        event = Event(id=next(self._ids), type=type, topics=topics, data=data)
+        self._last_id = event.id
+        self._history.append(event)
+        for topic in topics:
+            for subscription in list(self._subscribers.get(topic, ())):
+                subscription.offer(event)
+        return event
+
+    def subscribe(self, topic: str, last_event_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(self, topic, self.queue_size)
+        if last_event_id is not None:
+            # replay and registration happen without yielding, so nothing falls in between
+            oldest = self._history[0].id if self._history else self._last_id + 1
+            # ids newer than ours come from before a restart; older than history were evicted
+            if last_event_id > self._last_id or last_event_id < oldest - 1:
+                subscription.offer(Event(id=last_event_id, type=RESYNC, topics=[topic], data={}))
+            else:
+                for event in self._history:
+                    if event.id > last_event_id and topic in event.topics:
+                        subscription.offer(event)
+        self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.topic]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "topics": len(self._subscribers),
+            "history": len(self._history),
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+broker = EventBroker(settings.EVENT_QUEUE_SIZE, settings.EVENT_HISTORY_SIZE)
+
+@on_configure
+def _configure() -> None:
+    broker.configure(settings.EVENT_QUEUE_SIZE, settings.EVENT_HISTORY_SIZE)
+
+def project_topic(project_id: int) -> str:
+    return f"project:{project_id}"
+
+def task_topic(task_id: int) -> str:
+    return f"task:{task_id}"
+
+# task and comment changes go to both the project's and the task's subscribers
+def publish_change(type: str, project_id: int, task_id: int, data: Dict[str, Any]) -> Event:
+    return broker.publish([project_topic(project_id), task_topic(task_id)], type, data)
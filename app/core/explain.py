@@ -0,0 +1,92 @@
+import asyncio
+import sys
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.pagination import DEFAULT_LIMIT, apply_id_keyset, apply_keyset
+from app.core.scheduler import pending_query
+from app.database import dispose_engines, get_engine
+from app.models import Comment, Project, ProjectActivity, Task, TaskStatus, TeamMembership
+from app.repositories import activity as activity_repo, comment as comment_repo, task as task_repo
+
+# Runs EXPLAIN on the hot query shapes and fails if they do not use their indexes:
+#   python -m app.core.explain
+
+
+# (name, query, indexes of which at least one must appear in the plan)
+def key_queries() -> List[Tuple[str, Select, Tuple[str, ...]]]:
+    return [
+        (
+            "tasks by project and status",
+            apply_keyset(task_repo.tasks_for_user_query(1, project_id=1, status=TaskStatus.TO_DO), Task).limit(DEFAULT_LIMIT),
+            ("ix_tasks_project_status_created_at",),
+        ),
+        (
+            "tasks by project",
+            apply_keyset(task_repo.tasks_for_user_query(1, project_id=1), Task).limit(DEFAULT_LIMIT),
+            ("ix_tasks_project_created_at", "ix_tasks_project_status_created_at"),
+        ),
+        (
+            "comments by task",
+            apply_keyset(comment_repo.comments_query(1), Comment).limit(DEFAULT_LIMIT),
+            ("ix_comments_task_created_at",),
+        ),
+        (
+            "activity by project",
+            apply_id_keyset(activity_repo.activity_query(1), ProjectActivity).limit(DEFAULT_LIMIT),
+            ("ix_project_activity_project_id",),
+        ),
+        ("projects by team", select(Project).where(Project.team_id == 1), ("ix_projects_team_id",)),
+        ("projects by owner", select(Project).where(Project.owner_id == 1), ("ix_projects_owner_id",)),
+        ("tasks by assignee", select(Task).where(Task.assigned_to == 1), ("ix_tasks_assigned_to",)),
+        (
+            "tasks coming due",
+            select(Task).where(Task.due_date <= func.now()).order_by(Task.due_date),
+            ("ix_tasks_due_date",),
+        ),
+        (
+            "due-date scheduler window",
+            pending_query(datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 2, tzinfo=timezone.utc), 1)
+            .limit(DEFAULT_LIMIT),
+            ("ix_tasks_due_date",),
+        ),
+        (
+            "members of team",
+            select(TeamMembership).where(TeamMembership.team_id == 1),
+            ("ix_team_memberships_team_id",),
+        ),
+    ]
+
+async def explain(conn: AsyncConnection, query: Select) -> str:
+    sql = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN " if conn.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN "
+    result = await conn.exec_driver_sql(prefix + sql)
+    return "\n".join(str(row[-1]) for row in result)
+
+async def check() -> List[str]:
+    failures = []
+    async with get_engine().connect() as conn:
+        async with conn.begin():
+            if conn.dialect.name == "postgresql":
+                # small tables are always seq-scanned; we want to know the index is usable
+                await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            for name, query, indexes in key_queries():
+                plan = await explain(conn, query)
+                if not any(index in plan for index in indexes):
+                    failures.append(f"{name}: expected one of {', '.join(indexes)}\n{plan}")
+    await dispose_engines()
+    return failures
+
+def main() -> None:
+    failures = asyncio.run(check())
+    for failure in failures:
+        print(f"FAIL {failure}\n")
+    print(f"{len(key_queries()) - len(failures)} ok, {len(failures)} failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import logging
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+slow_query_log = logging.getLogger("app.slow_query")
+
+
+class StatementCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+        # "METHOD /path" of the request being counted, for the slow query log
+        self.request: Optional[str] = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+_statement_counter: ContextVar[Optional[StatementCounter]] = ContextVar("statement_counter", default=None)
+
+@contextmanager
+def count_statements() -> Iterator[StatementCounter]:
+    counter = StatementCounter()
+    token = _statement_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _statement_counter.reset(token)
+
+def record_hash_time(seconds: float) -> None:
+    counter = _statement_counter.get()
+    if counter is not None:
+        counter.hash_seconds += seconds
+
+
+# collapse the parts of a statement that vary between calls of the same query
+_PLACEHOLDER = r"(?:\?|%s|\$\d+|:\w+|%\(\w+\)s)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_REPEATED_ROWS = re.compile(r"(\(\?(?:, \.\.\.)?\))(?:\s*,\s*\1)+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?, ...)", statement)
+    return _REPEATED_ROWS.sub(r"\1, ...", statement)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+    counter = _statement_counter.get()
+    if counter is not None:
+        counter.statements.append(statement)
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    counter = _statement_counter.get()
+    if counter is not None:
+        counter.db_seconds += elapsed
+    if settings.SLOW_QUERY_MS is not None and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        slow_query_log.warning(
+            "slow query %.1fms request=%s: %s",
+            elapsed * 1000, counter.request if counter else None, normalize_sql(statement),
+        )
+
+def _handle_error(exception_context):
+    # the statement failed, so after_cursor_execute will not pop its start time
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+def instrument_engine(engine) -> None:
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    # the time spent here is waiting for a free connection (or opening a new one)
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            counter = _statement_counter.get()
+            if counter is not None:
+                counter.pool_wait_seconds += time.perf_counter() - started
+
+def pool_stats(engine) -> Dict[str, int]:
+    pool = engine.sync_engine.pool
+    # only queue pools track these; SQLite runs report nothing
+    return {
+        name: getattr(pool, name)()
+        for name in ("size", "checkedin", "checkedout", "overflow")
+        if hasattr(pool, name)
+    }
+
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # labels -> (per-bucket counts, +Inf count, sum)
+        self._series: Dict[Tuple[Tuple[str, str], ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += 1
+        series[2] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, value_sum) in sorted(self._series.items()):
+            labels = ",".join(f'{name}="{value}"' for name, value in key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {total}')
+            lines.append(f"{self.name}_sum{{{labels}}} {value_sum}")
+            lines.append(f"{self.name}_count{{{labels}}} {total}")
+        return lines
+
+
+request_duration = Histogram("http_request_duration_seconds", "Request latency", DURATION_BUCKETS)
+request_db_time = Histogram("http_request_db_seconds", "Time spent executing SQL per request", DURATION_BUCKETS)
+request_pool_wait = Histogram("http_request_pool_wait_seconds", "Time spent waiting for a DB connection per request", DURATION_BUCKETS)
+request_statements = Histogram("http_request_db_statements", "SQL statements per request", STATEMENT_BUCKETS)
+request_hash_time = Histogram("http_request_password_hash_seconds", "Time spent hashing/verifying passwords per request", DURATION_BUCKETS)
+HISTOGRAMS = (request_duration, request_db_time, request_pool_wait, request_statements, request_hash_time)
+
+
+def server_timing(counter: StatementCounter, total_seconds: float) -> str:
+    metrics = [
+        f'db;dur={counter.db_seconds * 1000:.1f};desc="{counter.count} statements"',
+        f"pool;dur={counter.pool_wait_seconds * 1000:.1f}",
+    ]
+    if counter.hash_seconds:
+        metrics.append(f"hash;dur={counter.hash_seconds * 1000:.1f}")
+    # everything else: routing, validation, handler code and serialization
+    app_seconds = total_seconds - counter.db_seconds - counter.pool_wait_seconds - counter.hash_seconds
+    metrics.append(f"app;dur={max(app_seconds, 0) * 1000:.1f}")
+    metrics.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(metrics)
+
+
+class RequestMetricsMiddleware:
+    """Times each HTTP request and reports its DB, pool and hashing time.
+
+    The breakdown is sent as a Server-Timing header and recorded in per-route
+    histograms rendered by `render_metrics`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status_code = 500
+
+        with count_statements() as counter:
+            counter.request = f"{scope['method']} {scope['path']}"
+
+            async def send_with_timing(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    header = server_timing(counter, time.perf_counter() - started)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                # routing has matched by now; label by the route template to keep cardinality bounded
+                route = scope.get("route")
+                route_path = getattr(route, "path_format", None) or "unmatched"
+                labels = {"method": scope["method"], "route": route_path}
+                request_duration.observe(time.perf_counter() - started, status=str(status_code), **labels)
+                request_db_time.observe(counter.db_seconds, **labels)
+                request_pool_wait.observe(counter.pool_wait_seconds, **labels)
+                request_statements.observe(counter.count, **labels)
+                if counter.hash_seconds:
+                    request_hash_time.observe(counter.hash_seconds, **labels)
+
+
+def _render_samples(kind: str, samples: Dict[str, float]) -> List[str]:
+    # samples are named with their labels, e.g. 'db_pool_size{engine="primary"}';
+    # each family gets one TYPE line and its samples together
+    lines: List[str] = []
+    family = None
+    for name, value in sorted(samples.items(), key=lambda item: item[0].split("{", 1)[0]):
+        if name.split("{", 1)[0] != family:
+            family = name.split("{", 1)[0]
+            lines.append(f"# TYPE {family} {kind}")
+        lines.append(f"{name} {value}")
+    return lines
+
+def render_metrics(engines: Dict[str, object], gauges: Dict[str, float] = None, counters: Dict[str, float] = None) -> str:
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    pools = {
+        f'db_pool_{name}{{engine="{engine_name}"}}': value
+        for engine_name, engine in engines.items()
+        for name, value in pool_stats(engine).items()
+    }
+    lines.extend(_render_samples("gauge", {**pools, **(gauges or {})}))
+    lines.extend(_render_samples("counter", counters or {}))
+    return "\n".join(lines) + "\n"
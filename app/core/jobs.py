@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import on_configure, settings
+from app.schemas import JobOut
+
+# In-process registry of background jobs (e.g. chunked deletes). Jobs run as tasks on the
+# worker's event loop and report progress as they go; finished jobs are kept, up to
+# JOB_HISTORY_SIZE, so clients can poll for the outcome. Like the change feed, job ids are
+# only meaningful within one worker process, and a restart abandons running jobs: their
+# work is resumable because every chunk commits on its own.
+
+job_log = logging.getLogger("app.jobs")
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    owner_id: int
+    total: int
+    done: int = 0
+    status: str = PENDING
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+    def advance(self, count: int) -> None:
+        self.done += count
+
+
+class JobRegistry:
+    def __init__(self, history_size: int):
+        self.history_size = history_size
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        # running jobs by what they work on, so a repeated request joins the running job
+        self._active: Dict[Hashable, Job] = {}
+        # the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(
+        self,
+        kind: str,
+        target: Hashable,
+        owner_id: int,
+        total: int,
+        work: Callable[[Job], Awaitable[Any]],
+    ) -> Job:
+        job = self._active.get((kind, target))
+        if job is not None:
+            return job
+        job = Job(id=uuid.uuid4().hex, kind=kind, owner_id=owner_id, total=total)
+        self._jobs[job.id] = job
+        self._active[(kind, target)] = job
+        task = asyncio.get_running_loop().create_task(self._run(job, (kind, target), work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._trim()
+        return job
+
+    async def _run(self, job: Job, key: Hashable, work: Callable[[Job], Awaitable[Any]]) -> None:
+        job.status = RUNNING
+        try:
+            await work(job)
+            job.status = DONE
+        except Exception as exc:
+            job_log.exception("job %s (%s) failed", job.id, job.kind)
+            job.status = FAILED
+            job.error = str(exc)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            self._active.pop(key, None)
+
+    def _trim(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(len(self._jobs) - self.history_size, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {"jobs": len(self._jobs), "running": len(self._active)}
+
+
+jobs = JobRegistry(settings.JOB_HISTORY_SIZE)
+
+@on_configure
+def _configure() -> None:
+    jobs.history_size = settings.JOB_HISTORY_SIZE
+
+def job_accepted(job: Job) -> JSONResponse:
+    # 202 for work that continues after the response; poll the Location for progress
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(JobOut.from_orm(job)),
+        headers={"Location": f"{settings.API_V1_STR}/jobs/{job.id}"},
+    )
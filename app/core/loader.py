@@ -0,0 +1,106 @@
+import asyncio
+from functools import partial
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.repositories import project as project_repo, team as team_repo, user as user_repo
+
+# Request-scoped batching of related entity lookups. Keys loaded in the same turn of the
+# event loop (one load_many, or loads awaited together with asyncio.gather) are fetched
+# with a single IN (...) query per loader, and every result is kept for the rest of the
+# request, so resolving the project, team membership or assignee of N tasks costs one
+# query per entity type instead of N.
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    def __init__(self, batch: Callable[[List[K]], Awaitable[Dict[K, V]]], lock: asyncio.Lock):
+        self._batch = batch
+        # loaders of one request share its session, which runs one statement at a time
+        self._lock = lock
+        self._results: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        # the loop only keeps weak references to tasks
+        self._dispatches: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> Awaitable[Optional[V]]:
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._results[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                # runs once the caller yields, by which time its sibling loads are queued too
+                task = loop.create_task(self._dispatch())
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> Dict[K, Optional[V]]:
+        keys = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*map(self.load, keys))
+        return dict(zip(keys, values))
+
+    def prime(self, key: K, value: V) -> None:
+        if key not in self._results:
+            self._results[key] = asyncio.get_running_loop().create_future()
+            self._results[key].set_result(value)
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        try:
+            async with self._lock:
+                values = await self._batch(keys)
+        except BaseException as exc:
+            # failures are not remembered, a later load tries again; a cancelled batch
+            # (client gone, lane timeout) cancels its loads instead of leaving them pending
+            for key in keys:
+                future = self._results.pop(key)
+                if future.done():
+                    continue
+                if isinstance(exc, Exception):
+                    future.set_exception(exc)
+                else:
+                    future.cancel()
+            if not isinstance(exc, Exception):
+                raise
+            return
+        for key in keys:
+            # a waiter that was cancelled itself cancelled the future it awaited; keep the
+            # value for later loads anyway
+            if self._results[key].done():
+                self._results[key] = asyncio.get_running_loop().create_future()
+            self._results[key].set_result(values.get(key))
+
+
+class Loaders:
+    def __init__(self, db: AsyncSession):
+        lock = asyncio.Lock()
+        # project_id -> Project
+        self.projects = DataLoader(partial(project_repo.get_projects_by_ids, db), lock)
+        # (user_id, team_id) -> role, or None when the user is not a member
+        self.memberships = DataLoader(partial(team_repo.get_member_roles, db), lock)
+        # user_id -> User
+        self.users = DataLoader(partial(user_repo.get_users_by_ids, db), lock)
+
+    async def team_roles(self, user_id: int, project_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+        """The user's role in the team of each project (None: not a member, or no such project)."""
+        projects = await self.projects.load_many(project_ids)
+        roles = await self.memberships.load_many(
+            (user_id, project.team_id) for project in projects.values() if project is not None
+        )
+        return {
+            project_id: roles[(user_id, project.team_id)] if project is not None else None
+            for project_id, project in projects.items()
+        }
+
+
+async def get_loaders(db: AsyncSession = Depends(get_db)) -> Loaders:
+    # dependencies are cached per request, so every dependent of a request shares these;
+    # async so it is not sent to the threadpool
+    return Loaders(db)
@@ -0,0 +1,136 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.serialization import Fields, render_item, select_columns
+from app.database import SessionLocal
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+STREAM_CHUNK_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def encode_id_cursor(id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": id}).encode()).decode()
+
+def decode_id_cursor(cursor: str) -> int:
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["after"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def encode_offset(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+def decode_offset(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        offset = int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["offset"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+def parse_ids(ids: str) -> List[int]:
+    """Validate an `ids=1,2,3` query parameter of a batch read; drops repeats, keeps the order."""
+    try:
+        parsed = list(dict.fromkeys(int(id) for id in ids.split(",") if id.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ids, expected comma-separated integers")
+    if not parsed or len(parsed) > MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Give between 1 and {MAX_LIMIT} ids")
+    return parsed
+
+def apply_keyset(query: Select, model, cursor: Optional[str] = None) -> Select:
+    # rows are ordered by (created_at, id); the cursor is the last row already seen
+    query = query.order_by(model.created_at, model.id)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.where(or_(
+            model.created_at > created_at,
+            and_(model.created_at == created_at, model.id > last_id),
+        ))
+    return query
+
+def apply_id_keyset(query: Select, model, cursor: Optional[str] = None) -> Select:
+    # rows in insertion order, for tables whose created_at is not assigned in that order
+    query = query.order_by(model.id)
+    if cursor:
+        query = query.where(model.id > decode_id_cursor(cursor))
+    return query
+
+async def paginate_by_id(
+    db: AsyncSession,
+    query: Select,
+    model,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Tuple[List, Optional[str]]:
+    rows = (await db.execute(apply_id_keyset(query, model, cursor).limit(limit + 1))).scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_id_cursor(rows[-1].id)
+    return rows, next_cursor
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Tuple[List, Optional[str]]:
+    # fetch one extra row to know whether there is a next page
+    result = await db.execute(apply_keyset(query, model, cursor).limit(limit + 1))
+    # entity queries return objects, column queries (see core.serialization) return rows
+    entity = query.column_descriptions[0]["entity"] is model and len(query.column_descriptions) == 1
+    rows = result.scalars().all() if entity else result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+def stream_ndjson(
+    db: AsyncSession,
+    query: Select,
+    model,
+    schema: Type[BaseModel],
+    cursor: Optional[str] = None,
+    fields: Fields = None,
+) -> StreamingResponse:
+    columns = select_columns(model, schema, fields)
+    if columns:
+        query = query.with_only_columns(*columns)
+    query = apply_keyset(query, model, cursor).execution_options(yield_per=STREAM_CHUNK_SIZE)
+    bind = db.bind
+
+    async def lines():
+        # the request session may be closed before the body is sent, so use our own, on the
+        # engine get_db routed the request to (a replica, unless the user just wrote)
+        async with SessionLocal(bind=bind) as session:
+            result = await session.stream(query)
+            async for row in (result if columns else result.scalars()):
+                yield render_item(model, schema, row, fields) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,256 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import on_configure, settings
+from app.core.etag import collection_etag, etag_matches, not_modified
+from app.core.serialization import Fields, json_response, render_page
+from app.database import reading_replica
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional, only needed for RESPONSE_CACHE_BACKEND=redis
+    redis = None
+
+
+# cached list responses are stored as "<etag>\n<json body>"
+def _pack(etag: str, body: bytes) -> bytes:
+    return etag.encode() + b"\n" + body
+
+def _unpack(value: bytes) -> Tuple[str, bytes]:
+    etag, body = value.split(b"\n", 1)
+    return etag.decode(), body
+
+
+# in-process LRU bounded by entry count and body bytes, entries expire ttl seconds after being set
+class MemoryBackend:
+    def __init__(self, maxsize: int, max_bytes: int, ttl: float):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.evictions = 0
+        self._bytes = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, tags: Iterable[str]) -> None:
+        self._remove(key)
+        tags = tuple(tags)
+        self._data[key] = (time.monotonic() + self.ttl, value, tags)
+        self._bytes += len(value)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while self._data and (len(self._data) > self.maxsize or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in tags:
+            for key in self._tags.pop(tag, ()):
+                removed += self._remove(key)
+        return removed
+
+    async def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+        self._bytes = 0
+
+    async def memory(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: str) -> int:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return 0
+        self._bytes -= len(entry[1])
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return 1
+
+
+# shared across workers; each tag is a set of the keys stored under it
+class RedisBackend:
+    def __init__(self, url: str, ttl: float, prefix: str = "response-cache:"):
+        if redis is None:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package")
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, tags: Iterable[str]) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.set(self.prefix + key, value, ex=self.ttl)
+            for tag in tags:
+                pipe.sadd(self.prefix + "tag:" + tag, self.prefix + key)
+                pipe.expire(self.prefix + "tag:" + tag, self.ttl)
+            await pipe.execute()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            keys = await self._client.smembers(tag_key)
+            if keys:
+                removed += await self._client.delete(*keys)
+            await self._client.delete(tag_key)
+        return removed
+
+    async def clear(self) -> None:
+        async for key in self._client.scan_iter(match=self.prefix + "*"):
+            await self._client.delete(key)
+
+    async def memory(self) -> Dict[str, Any]:
+        info = await self._client.info("memory")
+        return {"backend": "redis", "used_memory": info.get("used_memory")}
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.discarded = 0
+        # bumped on every invalidation in this process, see set()
+        self.generation = 0
+        # tags invalidated within the replica lag window, see set()
+        self._recent_tags = TTLCache(settings.RESPONSE_CACHE_SIZE, settings.REPLICA_MAX_LAG_SECONDS)
+
+    def configure(self, backend) -> None:
+        self.backend = backend
+        self._recent_tags.configure(settings.RESPONSE_CACHE_SIZE, settings.REPLICA_MAX_LAG_SECONDS)
+
+    async def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _unpack(value)
+
+    async def set(
+        self, key: str, etag: str, body: bytes, tags: Iterable[str], generation: int, replica: bool = False
+    ) -> None:
+        tags = tuple(tags)
+        # a write committed (and invalidated) while this response was being built, or
+        # recently enough that a replica may not have it yet; it may be stale
+        if generation != self.generation or (
+            replica and any(self._recent_tags.get(tag) is not MISSING for tag in tags)
+        ):
+            self.discarded += 1
+            return
+        await self.backend.set(key, _pack(etag, body), tags)
+
+    async def invalidate(self, *tags: str) -> None:
+        self.generation += 1
+        for tag in tags:
+            self._recent_tags.set(tag, True)
+        self.invalidations += await self.backend.invalidate_tags(tags)
+
+    async def clear(self) -> None:
+        self.generation += 1
+        await self.backend.clear()
+
+    async def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidated_entries": self.invalidations,
+            "discarded_stale": self.discarded,
+            **await self.backend.memory(),
+        }
+
+
+def _key_part(part: Hashable) -> str:
+    if part is None:
+        return ""
+    # e.g. a sparse fieldset
+    return ",".join(map(str, part)) if isinstance(part, tuple) else str(part)
+
+def cache_key(*parts: Hashable) -> str:
+    return ":".join(_key_part(part) for part in parts)
+
+def user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def team_tag(team_id: int) -> str:
+    return f"team:{team_id}"
+
+def project_tag(project_id: int) -> str:
+    return f"project:{project_id}"
+
+def task_tag(task_id: int) -> str:
+    return f"task:{task_id}"
+
+def deleted_tree_tags(tree) -> List[str]:
+    # tags touched by a DeletedTree (app.repositories.deletion); the caller adds the team's
+    return [
+        *map(project_tag, tree.project_ids),
+        *map(task_tag, tree.task_ids),
+        *map(user_tag, {*tree.owner_ids, *tree.member_ids}),
+    ]
+
+def cached_response(etag: str, body: bytes, if_none_match: Optional[str]) -> Response:
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(body, etag)
+
+async def cached_page(
+    key: str,
+    tags: Iterable[str],
+    model,
+    schema: Type[BaseModel],
+    load: Callable[[], Awaitable[Tuple[List, Optional[str]]]],
+    if_none_match: Optional[str] = None,
+    fields: Fields = None,
+) -> Response:
+    cached = await response_cache.get(key)
+    if cached is None:
+        generation = response_cache.generation
+        rows, next_cursor = await load()
+        body = render_page(model, schema, rows, next_cursor, fields)
+        cached = (collection_etag(rows, next_cursor), body)
+        await response_cache.set(key, *cached, tags=tags, generation=generation, replica=reading_replica())
+    return cached_response(*cached, if_none_match)
+
+def _backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.RESPONSE_CACHE_URL, settings.RESPONSE_CACHE_TTL)
+    return MemoryBackend(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_MAX_BYTES, settings.RESPONSE_CACHE_TTL)
+
+response_cache = ResponseCache(_backend())
+
+@on_configure
+def _configure() -> None:
+    response_cache.configure(_backend())
@@ -0,0 +1,238 @@
+import asyncio
+import heapq
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, and_, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.events import publish_change
+from app.database import SessionLocal, get_engine
+from app.models import Task, TaskStatus
+
+# Due-date notices: a "task.due_soon" reminder DUE_REMINDER_MINUTES before a task is due,
+# and at the due date the task's overdue flag and a "task.overdue" event. One worker at
+# a time, the holder of a Postgres advisory lock, keeps a min-heap of the notices falling
+# due within DUE_LOOKAHEAD_SECONDS. It fills the heap with range scans over
+# ix_tasks_due_date, one slice of the timeline at a time, so the work follows the tasks
+# coming due and never the size of the table.
+#
+# A notice is applied with a conditional UPDATE ... RETURNING, so it takes effect (and
+# is published) once even if two workers briefly both lead, and a heap entry left stale
+# by an edit or delete elsewhere matches nothing. Task writes on the leading worker
+# reach the heap directly (task_changed); writes on other workers are picked up by the
+# rescan of the loaded window every DUE_RESCAN_SECONDS. Like the rest of the change
+# feed, the events reach the subscribers of the leading worker.
+
+scheduler_log = logging.getLogger("app.scheduler")
+
+REMINDER, OVERDUE = "task.due_soon", "task.overdue"
+
+# pg_try_advisory_lock key, the same for every worker
+LOCK_KEY = 0x6475655f
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _aware(value: datetime) -> datetime:
+    # SQLite returns naive datetimes for timezone-aware columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def pending_query(start: datetime, end: datetime, last_id: Optional[int] = None) -> Select:
+    """Tasks due in (start, end] with notices still to apply, keyset ordered by (due_date, id)."""
+    after = Task.due_date > start
+    if last_id is not None:
+        after = or_(after, and_(Task.due_date == start, Task.id > last_id))
+    return (
+        select(Task.id, Task.due_date)
+        .where(after, Task.due_date <= end, Task.overdue.is_(False), Task.status != TaskStatus.DONE)
+        .order_by(Task.due_date, Task.id)
+    )
+
+
+class DueScheduler:
+    def __init__(self):
+        self.leading = False
+        self.reminders = 0
+        self.overdue = 0
+        # (fires_at, task_id, kind, due_date)
+        self._heap: List[Tuple[datetime, int, str, datetime]] = []
+        # the due date each queued task is queued with; entries that disagree are stale
+        self._queued: Dict[int, datetime] = {}
+        self._loaded_until: Optional[datetime] = None
+        self._lock_conn: Optional[AsyncConnection] = None
+        self._wakeup = asyncio.Event()
+
+    # --- sync with task writes (on this worker) ---
+
+    def task_changed(self, task_id: int, due_date: Optional[datetime], status) -> None:
+        if not self.leading:
+            return
+        if due_date is None or status == TaskStatus.DONE:
+            self._queued.pop(task_id, None)
+            return
+        due_date = _aware(due_date)
+        # later due dates are loaded when the window reaches them
+        if due_date <= self._loaded_until:
+            self._push(task_id, due_date)
+            self._wakeup.set()
+
+    def task_deleted(self, task_id: int) -> None:
+        self._queued.pop(task_id, None)
+
+    def _push(self, task_id: int, due_date: datetime) -> None:
+        if self._queued.get(task_id) == due_date:
+            return
+        self._queued[task_id] = due_date
+        heapq.heappush(self._heap, (due_date - timedelta(minutes=settings.DUE_REMINDER_MINUTES), task_id, REMINDER, due_date))
+        heapq.heappush(self._heap, (due_date, task_id, OVERDUE, due_date))
+
+    # --- loading and firing ---
+
+    async def _load(self, start: datetime, end: datetime) -> None:
+        last_id = None
+        async with SessionLocal() as db:
+            while True:
+                result = await db.execute(pending_query(start, end, last_id).limit(settings.DUE_BATCH_SIZE))
+                rows = result.all()
+                for task_id, due_date in rows:
+                    self._push(task_id, _aware(due_date))
+                if len(rows) < settings.DUE_BATCH_SIZE:
+                    return
+                start, last_id = rows[-1].due_date, rows[-1].id
+
+    def _pop_due(self, now: datetime) -> Dict[str, List[int]]:
+        due: Dict[str, List[int]] = {REMINDER: [], OVERDUE: []}
+        while self._heap and self._heap[0][0] <= now and len(due[REMINDER]) + len(due[OVERDUE]) < settings.DUE_BATCH_SIZE:
+            _, task_id, kind, due_date = heapq.heappop(self._heap)
+            if self._queued.get(task_id) != due_date:
+                continue
+            due[kind].append(task_id)
+            if kind == OVERDUE:
+                del self._queued[task_id]
+        return due
+
+    async def _fire(self, now: datetime) -> None:
+        from app.core.response_cache import project_tag, response_cache
+
+        while self._heap and self._heap[0][0] <= now:
+            due = self._pop_due(now)
+            reminded = overdue = []
+            async with SessionLocal() as db:
+                returning = (Task.id, Task.project_id, Task.due_date, Task.assigned_to)
+                if due[REMINDER]:
+                    # due_reminded is not part of the task representation: keep updated_at (an
+                    # onupdate column) as it is, so the version, ETag and cached pages stay valid
+                    result = await db.execute(
+                        update(Task).where(
+                            Task.id.in_(due[REMINDER]), Task.due_reminded.is_(False), Task.overdue.is_(False),
+                            Task.status != TaskStatus.DONE,
+                            Task.due_date > now, Task.due_date <= now + timedelta(minutes=settings.DUE_REMINDER_MINUTES),
+                        ).values(due_reminded=True, updated_at=Task.updated_at).returning(*returning)
+                        .execution_options(synchronize_session=False)
+                    )
+                    reminded = result.all()
+                if due[OVERDUE]:
+                    # overdue is part of the task representation, so it gets a new version (ETag)
+                    result = await db.execute(
+                        update(Task).where(
+                            Task.id.in_(due[OVERDUE]), Task.overdue.is_(False), Task.status != TaskStatus.DONE,
+                            Task.due_date <= now,
+                        ).values(overdue=True, due_reminded=True, version=Task.version + 1).returning(*returning)
+                        .execution_options(synchronize_session=False)
+                    )
+                    overdue = result.all()
+                await db.commit()
+            if overdue:
+                await response_cache.invalidate(*{project_tag(row.project_id) for row in overdue})
+            for kind, rows in ((REMINDER, reminded), (OVERDUE, overdue)):
+                for row in rows:
+                    publish_change(kind, row.project_id, row.id, {
+                        "id": row.id, "project_id": row.project_id,
+                        "due_date": _aware(row.due_date).isoformat(), "assigned_to": row.assigned_to,
+                    })
+            self.reminders += len(reminded)
+            self.overdue += len(overdue)
+
+    async def _lead(self) -> None:
+        lead = timedelta(minutes=settings.DUE_REMINDER_MINUTES)
+        lookahead = timedelta(seconds=settings.DUE_LOOKAHEAD_SECONDS)
+        catchup = timedelta(hours=settings.DUE_CATCHUP_HOURS)
+        rescan = timedelta(seconds=settings.DUE_RESCAN_SECONDS)
+
+        now = _now()
+        # the window is kept in due dates: reminders for it fire `lead` earlier
+        self._loaded_until = now + lead + lookahead
+        await self._load(now - catchup, self._loaded_until)
+        rescanned = now
+        while True:
+            self._wakeup.clear()
+            now = _now()
+            await self._fire(now)
+            if self._loaded_until < now + lead + lookahead / 2:
+                end = now + lead + lookahead
+                await self._load(self._loaded_until, end)
+                self._loaded_until = end
+            if now - rescanned >= rescan:
+                await self._check_lock()
+                await self._load(now - catchup, self._loaded_until)
+                rescanned = now
+            timeout = rescan.total_seconds()
+            if self._heap:
+                timeout = min(timeout, max((self._heap[0][0] - _now()).total_seconds(), 0))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # --- leadership ---
+
+    @asynccontextmanager
+    async def _leadership(self) -> AsyncIterator[bool]:
+        engine = get_engine()
+        if engine.dialect.name != "postgresql":
+            # SQLite (local runs) serves a single process
+            yield True
+            return
+        # a session-level lock, held for as long as this connection is; autocommit so the
+        # connection idles outside a transaction (no pinned xmin, no idle-in-transaction timeout)
+        async with engine.execution_options(isolation_level="AUTOCOMMIT").connect() as conn:
+            acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": LOCK_KEY})
+            self._lock_conn = conn if acquired else None
+            try:
+                yield acquired
+            finally:
+                self._lock_conn = None
+                if acquired:
+                    await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+
+    async def _check_lock(self) -> None:
+        # the lock goes with its connection; raises (and so steps down) when that is gone.
+        # The connection is in autocommit (see _leadership), so this opens no transaction
+        if self._lock_conn is not None:
+            await self._lock_conn.execute(text("SELECT 1"))
+
+    async def run(self) -> None:
+        while True:
+            try:
+                async with self._leadership() as acquired:
+                    if acquired:
+                        self.leading = True
+                        scheduler_log.info("leading the due-date scheduler")
+                        await self._lead()
+            except Exception:
+                scheduler_log.exception("due-date scheduler failed")
+            finally:
+                self.leading = False
+                self._heap, self._queued = [], {}
+            await asyncio.sleep(settings.DUE_LEADER_RETRY_SECONDS)
+
+    def stats(self) -> Dict[str, int]:
+        return {"leading": int(self.leading), "queued": len(self._heap), "reminders": self.reminders, "overdue": self.overdue}
+
+
+due_scheduler = DueScheduler()
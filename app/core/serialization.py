@@ -0,0 +1,99 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import ColumnProperty, RelationshipProperty, SynonymProperty, class_mapper
+
+from app.core.config import settings
+from app.schemas import Page
+
+try:
+    import orjson
+except ImportError:  # optional, column rows are then encoded with the json module
+    orjson = None
+
+# selected even when not requested: keyset cursors need (created_at, id), ETags need version
+_ALWAYS_SELECTED = ("id", "created_at", "version")
+
+Fields = Optional[Tuple[str, ...]]
+
+
+@lru_cache(maxsize=None)
+def _plan(model, schema: Type[BaseModel]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    # schema fields backed by a column (or a synonym of one), and defaults for the rest
+    # (e.g. CommentOut.updated_at); None when the schema nests a relationship (TeamOut.members)
+    columns = {}
+    for prop in class_mapper(model).iterate_properties:
+        if isinstance(prop, ColumnProperty):
+            columns[prop.key] = getattr(model, prop.key)
+        elif isinstance(prop, SynonymProperty):
+            columns[prop.key] = getattr(model, prop.name).label(prop.key)
+        elif isinstance(prop, RelationshipProperty) and prop.key in schema.__fields__:
+            return None
+    present = {name: columns[name] for name in schema.__fields__ if name in columns}
+    for name in _ALWAYS_SELECTED:
+        if name in columns and name not in present:
+            present[name] = columns[name]
+    defaults = {name: field.default for name, field in schema.__fields__.items() if name not in columns}
+    return present, defaults
+
+def parse_fields(schema: Type[BaseModel], fields: Optional[str]) -> Fields:
+    """Validate a `fields=a,b,c` query parameter against the schema."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(schema.__fields__)
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid fields: {', '.join(sorted(unknown)) or '(none)'}; allowed: {', '.join(schema.__fields__)}",
+        )
+    # schema order, so responses list fields in the same order as a full one
+    return tuple(name for name in schema.__fields__ if name in requested)
+
+def select_columns(model, schema: Type[BaseModel], fields: Fields = None) -> Optional[List]:
+    """Columns to select instead of the entity, or None to load ORM objects.
+
+    Column rows are used for sparse fieldsets and, with FAST_SERIALIZATION, for
+    every list response.
+    """
+    plan = _plan(model, schema)
+    if plan is None or (fields is None and not settings.FAST_SERIALIZATION):
+        return None
+    present, _ = plan
+    return [
+        column for name, column in present.items()
+        if fields is None or name in fields or name in _ALWAYS_SELECTED
+    ]
+
+def _row_dict(model, schema: Type[BaseModel], row: Row, fields: Fields) -> Dict[str, Any]:
+    present, defaults = _plan(model, schema)
+    mapping = row._mapping
+    # same keys, in the same order, as schema.from_orm(obj).dict()
+    return {
+        name: mapping[name] if name in present else defaults[name]
+        for name in (fields or schema.__fields__)
+    }
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(jsonable_encoder(value)).encode()
+
+def render_page(model, schema: Type[BaseModel], rows: Sequence, next_cursor: Optional[str], fields: Fields = None) -> bytes:
+    # column rows skip pydantic entirely; enums and datetimes are encoded by orjson
+    if rows and isinstance(rows[0], Row):
+        return _dumps({"items": [_row_dict(model, schema, row, fields) for row in rows], "next_cursor": next_cursor})
+    return Page[schema](items=rows, next_cursor=next_cursor).json().encode()
+
+def render_item(model, schema: Type[BaseModel], row, fields: Fields = None) -> bytes:
+    if isinstance(row, Row):
+        return _dumps(_row_dict(model, schema, row, fields))
+    return schema.from_orm(row).json().encode()
+
+def json_response(body: bytes, etag: str) -> Response:
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
@@ -0,0 +1,200 @@
+import codecs
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.schemas import CommentImport, TaskImport
+
+# Line formats of project export and import. Both are read and written a line at a time,
+# so neither side holds more than one task (with its comments) in memory.
+#
+# NDJSON, one task per line with its comments nested:
+#   {"id": 1, "title": "...", ..., "comments": [{"id": 4, "content": "...", "user_id": 2, ...}]}
+# CSV, a header and then each task row followed by the rows of its comments:
+#   kind,id,task_id,title,description,status,priority,assigned_to,due_date,created_by,user_id,content,created_at
+#   task,1,,Write docs,,to_do,medium,,,1,,,2026-01-01T00:00:00
+#   comment,4,1,,,,,,,,2,Looks good,2026-01-02T00:00:00
+#
+# Imports read what exports write. Ids, authors and timestamps are informational: imported
+# tasks and comments get new ids, the importing user as author and the import time.
+
+NDJSON, CSV = "ndjson", "csv"
+FORMATS = (NDJSON, CSV)
+MEDIA_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv"}
+
+TASK_FIELDS = ("id", "title", "description", "status", "priority", "assigned_to", "due_date", "created_by", "created_at")
+COMMENT_FIELDS = ("id", "content", "user_id", "created_at")
+CSV_COLUMNS = (
+    "kind", "id", "task_id", "title", "description", "status", "priority",
+    "assigned_to", "due_date", "created_by", "user_id", "content", "created_at",
+)
+
+# a line (or CSV record) longer than this is rejected instead of buffered
+MAX_LINE_LENGTH = 1024 * 1024
+
+
+def format_for(format: Optional[str], content_type: Optional[str]) -> str:
+    if format is None:
+        format = CSV if content_type and content_type.startswith("text/csv") else NDJSON
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format, use one of: {', '.join(FORMATS)}")
+    return format
+
+def _value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # enum columns come back as members of the (str) model enums
+    return getattr(value, "value", value)
+
+
+# --- export ---
+
+def _task_dict(row) -> Dict[str, Any]:
+    return {name: _value(getattr(row, name)) for name in TASK_FIELDS}
+
+def _comment_dict(row) -> Dict[str, Any]:
+    return {name: _value(getattr(row, f"comment_{name}")) for name in COMMENT_FIELDS}
+
+def _csv_line(values: Dict[str, Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(
+        ["" if values.get(name) is None else values[name] for name in CSV_COLUMNS]
+    )
+    return buffer.getvalue()
+
+async def export_lines(rows: AsyncIterator, format: str) -> AsyncIterator[str]:
+    """Encode task rows joined with their comments, ordered by task, as `format` lines."""
+    if format == CSV:
+        yield _csv_line({name: name for name in CSV_COLUMNS})
+    task = None
+    async for row in rows:
+        if task is None or task["id"] != row.id:
+            if task is not None and format == NDJSON:
+                yield json.dumps(task) + "\n"
+            task = _task_dict(row)
+            if format == NDJSON:
+                task["comments"] = []
+            else:
+                yield _csv_line({"kind": "task", **task})
+        if row.comment_id is not None:
+            comment = _comment_dict(row)
+            if format == NDJSON:
+                task["comments"].append(comment)
+            else:
+                yield _csv_line({"kind": "comment", "task_id": task["id"], **comment})
+    if task is not None and format == NDJSON:
+        yield json.dumps(task) + "\n"
+
+
+# --- import ---
+
+@dataclass
+class ImportItem:
+    line: int
+    task: TaskImport
+
+
+@dataclass
+class LineError:
+    line: int
+    error: str
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+            if len(pending) > MAX_LINE_LENGTH:
+                raise HTTPException(status_code=413, detail="Import line too long")
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import is not valid UTF-8")
+    if pending:
+        yield pending.rstrip("\r")
+
+async def _ndjson_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[Union[ImportItem, LineError]]:
+    number = 0
+    async for line in _lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            yield ImportItem(number, TaskImport.parse_raw(line))
+        except ValidationError as exc:
+            yield LineError(number, _validation_message(exc))
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple]:
+    # quoted fields may span lines: a record is complete once its quotes are balanced
+    number = start = 0
+    record: List[str] = []
+    async for line in _lines(chunks):
+        number += 1
+        if not record:
+            start = number
+        record.append(line)
+        text = "\n".join(record)
+        if text.count('"') % 2:
+            if len(text) > MAX_LINE_LENGTH:
+                raise HTTPException(status_code=413, detail="Import record too long")
+            continue
+        record = []
+        if text.strip():
+            yield start, next(csv.reader([text]))
+    if record:
+        yield start, next(csv.reader(["\n".join(record)]))
+
+async def _csv_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[Union[ImportItem, LineError]]:
+    header = None
+    pending: Optional[ImportItem] = None
+    source_id = None
+    async for number, values in _csv_records(chunks):
+        if header is None:
+            header = values
+            if "kind" not in header:
+                raise HTTPException(status_code=400, detail="CSV import needs a header row with a kind column")
+            continue
+        values = {name: value for name, value in zip(header, values) if value != ""}
+        kind = values.get("kind")
+        if kind == "task":
+            if pending is not None:
+                yield pending
+            pending = None
+            try:
+                pending = ImportItem(number, TaskImport.parse_obj(values))
+                source_id = values.get("id")
+            except ValidationError as exc:
+                yield LineError(number, _validation_message(exc))
+        elif kind == "comment":
+            # comments follow their task, so only the current task has to be kept
+            if pending is None:
+                yield LineError(number, "comment does not follow an imported task")
+                continue
+            if values.get("task_id", source_id) != source_id:
+                yield LineError(number, "comment does not follow its task")
+                continue
+            try:
+                pending.task.comments.append(CommentImport.parse_obj(values))
+            except ValidationError as exc:
+                yield LineError(number, _validation_message(exc))
+        else:
+            yield LineError(number, "kind must be task or comment")
+    if pending is not None:
+        yield pending
+
+def import_items(chunks: AsyncIterator[bytes], format: str) -> AsyncIterator[Union[ImportItem, LineError]]:
+    """Parse an upload stream into validated tasks and per-line errors, in input order."""
+    return _csv_items(chunks) if format == CSV else _ndjson_items(chunks)
@@ -1,12 +1,110 @@
+import asyncio
+import importlib
+from datetime import timedelta
+from typing import Optional
+
 from fastapi import FastAPI
-from app.routers import auth
-from app.schemas import project, team, user, task, comment
-from app.core.config import settings
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    version=settings.VERSION,
-    debug=settings.DEBUG
-)
+from app.core.config import Settings, configure, get_settings
+
+# The app is built by create_app(), which is all that importing this module defines:
+#   uvicorn --factory app.main:create_app
+# (`uvicorn app.main:app` still works, it builds the app on first access). Routers,
+# models and their dependencies are imported by create_app, after the settings are
+# configured; modules imported earlier re-apply them (app.core.config.on_configure).
+# Database engines are only created, and optionally warmed up, at startup.
+
+# (module, mounted under API_V1_STR)
+ROUTERS = [
+    ("app.routers.auth", True),
+    ("app.routers.user", True),
+    ("app.routers.team", True),
+    ("app.routers.project", True),
+    ("app.routers.task", True),
+    ("app.routers.comment", True),
+    ("app.routers.search", True),
+    ("app.routers.events", True),
+    ("app.routers.jobs", True),
+    ("app.routers.cache", True),
+    # scraped by Prometheus at the conventional path
+    ("app.routers.metrics", False),
+]
+
+
+def create_app(app_settings: Optional[Settings] = None) -> FastAPI:
+    if app_settings is not None:
+        configure(app_settings)
+    settings = get_settings()
+
+    from app.core.admission import AdmissionMiddleware
+    from app.core.instrumentation import RequestMetricsMiddleware
+
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        version=settings.VERSION,
+        debug=settings.DEBUG
+    )
+
+    if settings.ADMISSION_CONTROL:
+        app.add_middleware(AdmissionMiddleware)
+    # outermost, so rejected requests are timed and counted too
+    app.add_middleware(RequestMetricsMiddleware)
+
+    for module, versioned in ROUTERS:
+        router = importlib.import_module(module).router
+        app.include_router(router, prefix=settings.API_V1_STR if versioned else "")
+
+    @app.on_event("startup")
+    async def on_startup():
+        await startup(app)
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        await shutdown(app)
+
+    return app
+
+async def startup(app: FastAPI) -> None:
+    from app.database import init_engines, replicas, warm_up
+    from app.core.activity import activity_log
+    from app.core.scheduler import due_scheduler
+    from app.repositories.archive import run_archiver
+
+    settings = get_settings()
+    init_engines()
+    if settings.DB_POOL_WARMUP:
+        await warm_up(settings.DB_POOL_WARMUP)
+    if settings.ACTIVITY_LOG:
+        activity_log.start()
+    if replicas.engines:
+        app.state.replica_health_checks = asyncio.create_task(
+            replicas.run_health_checks(settings.REPLICA_HEALTH_CHECK_SECONDS)
+        )
+    if settings.ARCHIVE_AFTER_DAYS is not None:
+        app.state.archiver = asyncio.create_task(run_archiver(
+            timedelta(days=settings.ARCHIVE_AFTER_DAYS), settings.ARCHIVE_BATCH_SIZE, settings.ARCHIVE_INTERVAL_SECONDS
+        ))
+    if settings.DUE_SCHEDULER:
+        app.state.due_scheduler = asyncio.create_task(due_scheduler.run())
+
+async def shutdown(app: FastAPI) -> None:
+    from app.core.activity import activity_log
+    from app.database import dispose_engines
+
+    names = ("archiver", "replica_health_checks", "due_scheduler")
+    tasks = [getattr(app.state, name) for name in names if getattr(app.state, name, None) is not None]
+    for task in tasks:
+        task.cancel()
+    # let them unwind (the scheduler releases its lock connection, the archiver its batch)
+    # before their engines are disposed
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # writes what is still queued, so before the engines go
+    await activity_log.stop()
+    await dispose_engines()
+
 
-app.include_router(auth.router, prefix=settings.API_V1_STR, tags=["auth"])
+def __getattr__(name: str):
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,8 @@
+from app.models.user import User
+from app.models.team import Team, TeamMembership
+from app.models.project import Project
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.comment import Comment
+from app.models.summary import ProjectTaskCount, UNASSIGNED
+from app.models.archive import ArchivedTask, ArchivedComment
+from app.models.activity import ProjectActivity
@@ -0,0 +1,20 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+from app.database import Base
+
+class ProjectActivity(Base):
+    __tablename__ = 'project_activity'
+    __table_args__ = (
+        # the feed pages by id, see app.repositories.activity
+        Index('ix_project_activity_project_id', 'project_id', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # no foreign keys: entries are written behind the change (app.core.activity), so one
+    # may arrive after its project, task or user is gone and must not fail its batch
+    project_id = Column(Integer, nullable=False)
+    actor_id = Column(Integer, nullable=False)
+    type = Column(String(50), nullable=False)
+    task_id = Column(Integer)
+    data = Column(JSON, nullable=False, default=dict)
+    # when the change was made, not when the entry was written
+    created_at = Column(DateTime(timezone=True), nullable=False)
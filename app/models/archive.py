@@ -0,0 +1,41 @@
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, false, func, Enum, Index
+from app.database import Base
+from app.models.task import TaskPriority, TaskStatus
+
+# Cold storage for done tasks (and their comments), see app.repositories.archive. Rows keep
+# their ids and every column of the hot table, so the two can be read as one with UNION ALL.
+
+class ArchivedTask(Base):
+    __tablename__ = 'tasks_archive'
+    __table_args__ = (
+        Index('ix_tasks_archive_project_created_at', 'project_id', 'created_at', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
+    description = Column(String(500))
+    project_id = Column(Integer, ForeignKey('projects.id'), nullable=False)
+    created_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+    assigned_to = Column(Integer, ForeignKey('users.id'), nullable=True)
+    status = Column(Enum(TaskStatus))
+    priority = Column(Enum(TaskPriority))
+    due_date = Column(DateTime(timezone=True), nullable=True)
+    due_reminded = Column(Boolean, nullable=False, server_default=false())
+    overdue = Column(Boolean, nullable=False, server_default=false())
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    version = Column(Integer, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ArchivedComment(Base):
+    __tablename__ = 'comments_archive'
+    __table_args__ = (
+        Index('ix_comments_archive_task_created_at', 'task_id', 'created_at', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey('tasks_archive.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    content = Column(String(500), nullable=False)
+    created_at = Column(DateTime(timezone=True))
@@ -1,15 +1,18 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Index
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, utcnow
 
 class Comment(Base):
     __tablename__ = 'comments'
+    __table_args__ = (
+        Index('ix_comments_task_created_at', 'task_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey('tasks.id'), nullable=False)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     content = Column(String(500), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
-    task = relationship("Task", back_populates="comments")
-    user = relationship("User", backref="comments")
\ No newline at end of file
+    task = relationship("Task", back_populates="comments", lazy="raise_on_sql")
+    user = relationship("User", backref="comments", lazy="raise_on_sql")
\ No newline at end of file
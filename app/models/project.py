@@ -1,20 +1,24 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
-from sqlalchemy.orm import relationship
-from app.database import Base
+from sqlalchemy.orm import relationship, synonym
+from app.database import Base, utcnow
 
 class Project(Base):
     __tablename__ = 'projects'
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    owner_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    team_id = Column(Integer, ForeignKey('teams.id'), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    owner_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    team_id = Column(Integer, ForeignKey('teams.id'), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     description = Column(String(500), nullable=True)
     status = Column(String, default="active")
+    version = Column(Integer, nullable=False, server_default="1")
+    created_by = synonym("owner_id")
 
-    owner = relationship("User", backref="owned_projects")
-    team = relationship("Team", backref="projects")
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    __mapper_args__ = {"version_id_col": version}
+
+    owner = relationship("User", backref="owned_projects", lazy="raise_on_sql")
+    team = relationship("Team", backref="projects", lazy="raise_on_sql")
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", lazy="raise_on_sql")
     
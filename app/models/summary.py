@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, ForeignKey, Enum
+from app.database import Base
+from app.models.task import TaskStatus
+
+UNASSIGNED = 0
+
+class ProjectTaskCount(Base):
+    __tablename__ = 'project_task_counts'
+
+    project_id = Column(Integer, ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    status = Column(Enum(TaskStatus), primary_key=True)
+    # UNASSIGNED stands in for NULL so the column can be part of the primary key
+    assigned_to = Column(Integer, primary_key=True, default=UNASSIGNED)
+    count = Column(Integer, nullable=False, default=0)
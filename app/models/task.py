@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Enum
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, false, func, Enum, Index
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, utcnow
 from enum import Enum as PyEnum
 
 class TaskStatus(str, PyEnum):
@@ -8,18 +8,45 @@ class TaskStatus(str, PyEnum):
     IN_PROGRESS = "in_progress"
     DONE = "done"
 
+class TaskPriority(str, PyEnum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
 class Task(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # get_tasks: filter by project (and status), keyset order by (created_at, id)
+        Index('ix_tasks_project_status_created_at', 'project_id', 'status', 'created_at', 'id'),
+        Index('ix_tasks_project_created_at', 'project_id', 'created_at', 'id'),
+        # project summary: overdue open tasks
+        Index('ix_tasks_project_due_date', 'project_id', 'due_date'),
+        # archiver: done tasks by age
+        Index('ix_tasks_status_updated_at', 'status', 'updated_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(String(500))
-    project_id = Column(Integer, ForeignKey('project.id'), nullable=False)
-    assigned_to = Column(Integer, ForeignKey('users.id'), nullable=True)
+    project_id = Column(Integer, ForeignKey('projects.id'), nullable=False)
+    created_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+    assigned_to = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
     status = Column(Enum(TaskStatus), default=TaskStatus.TO_DO)
-    due_date = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM)
+    due_date = Column(DateTime(timezone=True), nullable=True, index=True)
+    # set by the due-date scheduler (app.core.scheduler), cleared when due_date changes
+    due_reminded = Column(Boolean, nullable=False, server_default=false())
+    overdue = Column(Boolean, nullable=False, server_default=false())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # bumped on every ORM update, which also checks it (optimistic locking); backs the ETag
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
 
-    project = relationship("Project", back_populates="tasks")
-    assignee = relationship("User", backref="assigned_tasks")
-    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
+    # relationships never lazy load (here or in the other models): each repository
+    # query names the relationships its endpoint needs with selectinload/joinedload
+    project = relationship("Project", back_populates="tasks", lazy="raise_on_sql")
+    creator = relationship("User", foreign_keys=[created_by], backref="created_tasks", lazy="raise_on_sql")
+    assignee = relationship("User", foreign_keys=[assigned_to], backref="assigned_tasks", lazy="raise_on_sql")
+    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan", lazy="raise_on_sql")
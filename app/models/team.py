@@ -1,25 +1,33 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, func
+from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, func, Index
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, utcnow
 
 class Team(Base):
     __tablename__ = 'teams'
+    __table_args__ = (
+        Index('ix_teams_created_at', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
     created_by = Column(Integer, ForeignKey('users.id'), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    # also bumped when members change, since TeamOut includes them
+    version = Column(Integer, nullable=False, server_default="1")
 
-    creator = relationship("User", backref="created_teams")
-    members = relationship("TeamMembership", back_populates="team")
+    __mapper_args__ = {"version_id_col": version}
+
+    creator = relationship("User", backref="created_teams", lazy="raise_on_sql")
+    members = relationship("TeamMembership", back_populates="team", lazy="raise_on_sql")
 
 
 class TeamMembership(Base):
     __tablename__ = 'team_memberships'
 
+    # the (user_id, team_id) primary key already serves lookups by user_id
     user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
-    team_id = Column(Integer, ForeignKey('teams.id'), primary_key=True)    
+    team_id = Column(Integer, ForeignKey('teams.id'), primary_key=True, index=True)
     role = Column(String, default="member")
 
-    user = relationship("User", backref="team_memberships")
-    team = relationship("Team", back_populates="members")
\ No newline at end of file
+    user = relationship("User", backref="team_memberships", lazy="raise_on_sql")
+    team = relationship("Team", back_populates="members", lazy="raise_on_sql")
\ No newline at end of file
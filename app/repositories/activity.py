@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import DEFAULT_LIMIT, paginate_by_id
+from app.database import SessionLocal
+from app.models import Project, ProjectActivity
+
+# pg_advisory_xact_lock key that orders activity writes, the same for every worker
+WRITE_LOCK_KEY = 0x61637476
+
+
+def activity_query(project_id: int) -> Select:
+    return select(ProjectActivity).where(ProjectActivity.project_id == project_id)
+
+async def list_activity(
+    db: AsyncSession,
+    project_id: int,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Tuple[List[ProjectActivity], Optional[str]]:
+    # paged by id, not created_at: an entry is stamped when queued but may be inserted after
+    # later ones (next batch, another worker), behind a (created_at, id) cursor already handed
+    # out. write_entries commits ids in order, so an id cursor never passes an uncommitted id
+    return await paginate_by_id(db, activity_query(project_id), ProjectActivity, limit, cursor)
+
+async def write_entries(entries: Sequence) -> int:
+    """Write a batch of app.core.activity entries in one multi-row INSERT; returns the rows written.
+
+    Team-wide entries (no project_id) become one row per project their team had at the time.
+    """
+    async with SessionLocal() as db:
+        team_projects: Dict[int, List[Tuple[int, datetime]]] = {}
+        team_ids = {entry.team_id for entry in entries if entry.project_id is None}
+        if team_ids:
+            result = await db.execute(
+                select(Project.team_id, Project.id, Project.created_at).where(Project.team_id.in_(team_ids))
+            )
+            for team_id, project_id, created_at in result:
+                # SQLite returns naive datetimes for timezone-aware columns
+                created_at = created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)
+                team_projects.setdefault(team_id, []).append((project_id, created_at))
+
+        def project_ids(entry) -> List[int]:
+            if entry.project_id is not None:
+                return [entry.project_id]
+            return [
+                project_id for project_id, created_at in team_projects.get(entry.team_id, ())
+                if created_at <= entry.created_at
+            ]
+
+        rows = [
+            {"project_id": project_id, "actor_id": entry.actor_id, "type": entry.type,
+             "task_id": entry.task_id, "data": entry.data, "created_at": entry.created_at}
+            for entry in entries
+            for project_id in project_ids(entry)
+        ]
+        if rows:
+            if db.bind.dialect.name == "postgresql":
+                # one writer at a time, from taking ids to commit, so ids commit in order and a
+                # cursor past an id never skips a lower one committed later (SQLite writes are
+                # serialized already)
+                await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": WRITE_LOCK_KEY})
+            await db.execute(insert(ProjectActivity), rows)
+            await db.commit()
+        return len(rows)
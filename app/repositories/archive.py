@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from sqlalchemy import and_, delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.database import SessionLocal, dispose_engines
+from app.models import ArchivedComment, ArchivedTask, Comment, Task, TaskStatus
+from app.repositories import summary as summary_repo
+
+# Done tasks that nobody touched for ARCHIVE_AFTER_DAYS move, with their comments, from
+# tasks/comments to tasks_archive/comments_archive. A batch is copied and deleted in one
+# transaction, so a task is always in exactly one of the two tables; the summary counts
+# (like every other default read) only cover the hot table. Run once with:
+#   python -m app.repositories.archive --days 90
+
+archive_log = logging.getLogger("app.archive")
+
+TASK_COLUMNS = [column.name for column in Task.__table__.columns]
+COMMENT_COLUMNS = [column.name for column in Comment.__table__.columns]
+
+
+def _archivable(cutoff: datetime):
+    # updated_at is only set once a task has been changed; created done, it never was
+    return and_(
+        Task.status == TaskStatus.DONE,
+        or_(Task.updated_at < cutoff, and_(Task.updated_at.is_(None), Task.created_at < cutoff)),
+    )
+
+async def archive_batch(db: AsyncSession, cutoff: datetime, batch_size: int) -> Dict[int, int]:
+    """Move one batch of eligible tasks; returns the project id of every archived task, by task id."""
+    # lock the batch so a concurrent archiver skips it and edits wait for the move
+    result = await db.execute(
+        select(Task.id).where(_archivable(cutoff)).order_by(Task.id).limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    task_ids = result.scalars().all()
+    if not task_ids:
+        return {}
+    await db.execute(insert(ArchivedTask).from_select(
+        TASK_COLUMNS, select(*(Task.__table__.c[name] for name in TASK_COLUMNS)).where(Task.id.in_(task_ids))
+    ))
+    await db.execute(insert(ArchivedComment).from_select(
+        COMMENT_COLUMNS,
+        select(*(Comment.__table__.c[name] for name in COMMENT_COLUMNS)).where(Comment.task_id.in_(task_ids)),
+    ))
+    await db.execute(delete(Comment).where(Comment.task_id.in_(task_ids)))
+    deleted = (await db.execute(
+        delete(Task).where(Task.id.in_(task_ids))
+        .returning(Task.id, Task.project_id, Task.status, Task.assigned_to)
+        .execution_options(synchronize_session=False)
+    )).all()
+    await summary_repo.record_deleted(db, [summary_repo.summary_key(*row[1:]) for row in deleted])
+    await db.commit()
+    return {row.id: row.project_id for row in deleted}
+
+async def archive_done_tasks(older_than: timedelta, batch_size: int) -> Dict[int, int]:
+    """Archive every eligible task, a batch per transaction; returns the project id of each, by task id."""
+    cutoff = datetime.now(timezone.utc) - older_than
+    archived_tasks = {}
+    # runs outside a request (background loop, CLI), so it uses its own session
+    async with SessionLocal() as db:
+        while True:
+            archived = await archive_batch(db, cutoff, batch_size)
+            archived_tasks.update(archived)
+            if archived:
+                archive_log.info("archived %d tasks", len(archived))
+            if len(archived) < batch_size:
+                break
+    return archived_tasks
+
+async def run_archiver(older_than: timedelta, batch_size: int, interval: float) -> None:
+    from app.core.response_cache import project_tag, response_cache, task_tag
+
+    while True:
+        try:
+            archived = await archive_done_tasks(older_than, batch_size)
+            if archived:
+                # task lists of the projects, and the comment pages of the tasks
+                await response_cache.invalidate(
+                    *map(project_tag, set(archived.values())), *map(task_tag, archived)
+                )
+        except Exception:
+            archive_log.exception("archiving failed")
+        await asyncio.sleep(interval)
+
+
+async def _main(days: int, batch_size: int) -> None:
+    archived = await archive_done_tasks(timedelta(days=days), batch_size)
+    print(f"archived {len(archived)} tasks of {len(set(archived.values()))} projects")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move done tasks older than --days to the archive tables")
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS or 90)
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(_main(args.days, args.batch_size))
@@ -0,0 +1,37 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import DEFAULT_LIMIT, paginate
+from app.models import Comment
+
+
+def comments_query(task_id: int) -> Select:
+    return select(Comment).where(Comment.task_id == task_id)
+
+async def list_comments(
+    db: AsyncSession,
+    task_id: int,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    columns: Optional[List] = None,
+) -> Tuple[List[Comment], Optional[str]]:
+    query = comments_query(task_id)
+    if columns:
+        query = query.with_only_columns(*columns)
+    return await paginate(db, query, Comment, limit, cursor)
+
+async def get_comment(db: AsyncSession, comment_id: int) -> Optional[Comment]:
+    return await db.get(Comment, comment_id)
+
+async def create_comment(db: AsyncSession, task_id: int, user_id: int, content: str) -> Comment:
+    comment = Comment(task_id=task_id, user_id=user_id, content=content)
+    db.add(comment)
+    await db.commit()
+    await db.refresh(comment)
+    return comment
+
+async def delete_comment(db: AsyncSession, comment: Comment) -> None:
+    await db.delete(comment)
+    await db.commit()
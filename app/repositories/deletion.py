@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import Select, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_team
+from app.database import SessionLocal
+from app.models import (
+    ArchivedComment, ArchivedTask, Comment, Project, ProjectActivity, ProjectTaskCount, Task, Team, TeamMembership,
+)
+from app.repositories import task as task_repo
+
+# Projects and teams are deleted with set-based DELETE statements, children first:
+# comments, tasks, their archived copies, summary rows, activity, projects, then memberships and the team. Nothing is
+# loaded into the session, so the cost no longer grows with ORM objects per row.
+# Large trees go through delete_tree_in_chunks instead, which removes the tasks a
+# chunk per transaction so no single transaction holds locks for the whole tree.
+
+
+@dataclass
+class DeletedTree:
+    # task_id -> project_id
+    task_projects: Dict[int, int] = field(default_factory=dict)
+    project_ids: List[int] = field(default_factory=list)
+    owner_ids: List[int] = field(default_factory=list)
+    member_ids: List[int] = field(default_factory=list)
+
+    @property
+    def task_ids(self) -> List[int]:
+        return list(self.task_projects)
+
+
+def _tasks_deleted(task_projects: Dict[int, int]) -> None:
+    # what the single task delete does after its commit: drop the scheduler's notices and
+    # tell the change feed
+    from app.core.events import publish_change
+    from app.core.scheduler import due_scheduler
+
+    for task_id, project_id in task_projects.items():
+        due_scheduler.task_deleted(task_id)
+        publish_change("task.deleted", project_id, task_id, {"id": task_id, "project_id": project_id})
+
+
+def project_ids_query(project_id: Optional[int] = None, team_id: Optional[int] = None) -> Select:
+    query = select(Project.id)
+    if project_id is not None:
+        query = query.where(Project.id == project_id)
+    if team_id is not None:
+        query = query.where(Project.team_id == team_id)
+    return query
+
+async def count_tasks(db: AsyncSession, projects: Select) -> int:
+    return await db.scalar(select(func.count()).select_from(Task).where(Task.project_id.in_(projects)))
+
+async def _delete_tree(db: AsyncSession, projects: Select, team_id: Optional[int] = None) -> DeletedTree:
+    # `projects` is re-evaluated by every statement, so projects added meanwhile go too
+    tree = DeletedTree()
+    task_ids = select(Task.id).where(Task.project_id.in_(projects))
+    await db.execute(delete(Comment).where(Comment.task_id.in_(task_ids)))
+    deleted = await db.execute(
+        delete(Task).where(Task.project_id.in_(projects)).returning(Task.id, Task.project_id)
+        .execution_options(synchronize_session=False)
+    )
+    tree.task_projects = dict(deleted.all())
+    archived_ids = select(ArchivedTask.id).where(ArchivedTask.project_id.in_(projects))
+    await db.execute(delete(ArchivedComment).where(ArchivedComment.task_id.in_(archived_ids)))
+    await db.execute(delete(ArchivedTask).where(ArchivedTask.project_id.in_(projects)))
+    await db.execute(delete(ProjectTaskCount).where(ProjectTaskCount.project_id.in_(projects)))
+    await db.execute(delete(ProjectActivity).where(ProjectActivity.project_id.in_(projects)))
+    deleted = await db.execute(
+        delete(Project).where(Project.id.in_(projects)).returning(Project.id, Project.owner_id)
+        .execution_options(synchronize_session=False)
+    )
+    for project_id, owner_id in deleted:
+        tree.project_ids.append(project_id)
+        tree.owner_ids.append(owner_id)
+    if team_id is not None:
+        deleted = await db.execute(
+            delete(TeamMembership).where(TeamMembership.team_id == team_id).returning(TeamMembership.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        tree.member_ids = deleted.scalars().all()
+        await db.execute(delete(Team).where(Team.id == team_id).execution_options(synchronize_session=False))
+    return tree
+
+async def delete_project(db: AsyncSession, project_id: int) -> DeletedTree:
+    tree = await _delete_tree(db, project_ids_query(project_id=project_id))
+    await db.commit()
+    _tasks_deleted(tree.task_projects)
+    return tree
+
+async def delete_team(db: AsyncSession, team_id: int) -> DeletedTree:
+    tree = await _delete_tree(db, project_ids_query(team_id=team_id), team_id)
+    await db.commit()
+    _tasks_deleted(tree.task_projects)
+    invalidate_team(team_id)
+    return tree
+
+async def delete_tree_in_chunks(
+    projects: Select,
+    team_id: Optional[int] = None,
+    chunk_size: int = 1000,
+    on_chunk: Optional[Callable[[List[int]], Awaitable[None]]] = None,
+) -> DeletedTree:
+    # runs outside a request (background job), so it uses its own session
+    async with SessionLocal() as db:
+        while True:
+            chunk = await db.execute(
+                select(Task.id, Task.project_id).where(Task.project_id.in_(projects)).order_by(Task.id).limit(chunk_size)
+            )
+            task_projects = dict(chunk.all())
+            if not task_projects:
+                break
+            task_ids = list(task_projects)
+            # comments, tasks and summary deltas of the chunk, committed on their own
+            await task_repo.bulk_delete_tasks(db, task_ids)
+            _tasks_deleted(task_projects)
+            if on_chunk is not None:
+                await on_chunk(task_ids)
+        # whatever was created since the last chunk goes with the projects themselves
+        tree = await _delete_tree(db, projects, team_id)
+        await db.commit()
+    _tasks_deleted(tree.task_projects)
+    if team_id is not None:
+        invalidate_team(team_id)
+    return tree
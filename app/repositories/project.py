@@ -0,0 +1,61 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import DEFAULT_LIMIT, paginate
+from app.models import Project, TeamMembership
+from app.repositories import team as team_repo
+
+
+def _accessible_by(user_id: int):
+    member_teams = select(TeamMembership.team_id).where(TeamMembership.user_id == user_id)
+    return or_(Project.owner_id == user_id, Project.team_id.in_(member_teams))
+
+def projects_for_user_query(user_id: int) -> Select:
+    return select(Project).where(_accessible_by(user_id))
+
+def project_ids_for_user_query(user_id: int) -> Select:
+    return select(Project.id).where(_accessible_by(user_id))
+
+async def list_projects_for_user(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    columns: Optional[List] = None,
+) -> Tuple[List[Project], Optional[str]]:
+    query = projects_for_user_query(user_id)
+    if columns:
+        query = query.with_only_columns(*columns)
+    return await paginate(db, query, Project, limit, cursor)
+
+async def get_project(db: AsyncSession, project_id: int, *options) -> Optional[Project]:
+    return await db.get(Project, project_id, options=options)
+
+async def can_access(db: AsyncSession, project: Project, user_id: int) -> bool:
+    if project.owner_id == user_id:
+        return True
+    return await team_repo.get_member_role(db, project.team_id, user_id) is not None
+
+async def get_projects_by_ids(db: AsyncSession, project_ids: List[int]) -> Dict[int, Project]:
+    result = await db.execute(select(Project).where(Project.id.in_(project_ids)))
+    return {project.id: project for project in result.scalars()}
+
+async def get_team_ids(db: AsyncSession, project_ids: Iterable[int]) -> Dict[int, int]:
+    result = await db.execute(select(Project.id, Project.team_id).where(Project.id.in_(list(project_ids))))
+    return dict(result.all())
+
+async def create_project(db: AsyncSession, values: dict, owner_id: int) -> Project:
+    project = Project(**values, owner_id=owner_id)
+    db.add(project)
+    await db.commit()
+    await db.refresh(project)
+    return project
+
+async def update_project(db: AsyncSession, project: Project, values: dict) -> Project:
+    for key, value in values.items():
+        setattr(project, key, value)
+    await db.commit()
+    await db.refresh(project)
+    return project
@@ -0,0 +1,92 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, Select, func, literal_column, select, text, union_all
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import DEFAULT_LIMIT
+from app.models import Comment, Task
+from app.repositories.project import project_ids_for_user_query
+
+# Postgres: these expressions are backed by GIN expression indexes (migration 0003),
+# so they must match the indexed expressions exactly.
+TASK_TSVECTOR = literal_column("to_tsvector('english', coalesce(tasks.title, '') || ' ' || coalesce(tasks.description, ''))")
+COMMENT_TSVECTOR = literal_column("to_tsvector('english', comments.content)")
+
+
+def _postgres_hits(q: str) -> Tuple[Select, Select]:
+    tsquery = func.websearch_to_tsquery('english', q)
+    task_hits = select(
+        literal_column("'task'").label("kind"),
+        Task.id.label("id"),
+        Task.id.label("task_id"),
+        Task.project_id.label("project_id"),
+        Task.title.label("text"),
+        func.ts_rank(TASK_TSVECTOR, tsquery).label("rank"),
+    ).where(TASK_TSVECTOR.op("@@")(tsquery))
+    comment_hits = select(
+        literal_column("'comment'").label("kind"),
+        Comment.id.label("id"),
+        Comment.task_id.label("task_id"),
+        Task.project_id.label("project_id"),
+        Comment.content.label("text"),
+        func.ts_rank(COMMENT_TSVECTOR, tsquery).label("rank"),
+    ).join(Task, Task.id == Comment.task_id).where(COMMENT_TSVECTOR.op("@@")(tsquery))
+    return task_hits, comment_hits
+
+def _fts5_match(q: str) -> str:
+    # quote every term so user input is never parsed as FTS5 query syntax
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+def _sqlite_hits(q: str) -> Tuple[Select, Select]:
+    match = _fts5_match(q)
+    task_fts = text("SELECT rowid, -bm25(tasks_fts) AS rank FROM tasks_fts WHERE tasks_fts MATCH :task_match")\
+        .bindparams(task_match=match).columns(rowid=Integer, rank=Float).subquery("task_fts")
+    comment_fts = text("SELECT rowid, -bm25(comments_fts) AS rank FROM comments_fts WHERE comments_fts MATCH :comment_match")\
+        .bindparams(comment_match=match).columns(rowid=Integer, rank=Float).subquery("comment_fts")
+    task_hits = select(
+        literal_column("'task'").label("kind"),
+        Task.id.label("id"),
+        Task.id.label("task_id"),
+        Task.project_id.label("project_id"),
+        Task.title.label("text"),
+        task_fts.c.rank.label("rank"),
+    ).join(task_fts, task_fts.c.rowid == Task.id)
+    comment_hits = select(
+        literal_column("'comment'").label("kind"),
+        Comment.id.label("id"),
+        Comment.task_id.label("task_id"),
+        Task.project_id.label("project_id"),
+        Comment.content.label("text"),
+        comment_fts.c.rank.label("rank"),
+    ).join(comment_fts, comment_fts.c.rowid == Comment.id).join(Task, Task.id == Comment.task_id)
+    return task_hits, comment_hits
+
+async def search(
+    db: AsyncSession,
+    user_id: int,
+    q: str,
+    limit: int = DEFAULT_LIMIT,
+    offset: int = 0,
+) -> Tuple[List[Row], Optional[int]]:
+    if not q.split():
+        return [], None
+    if db.bind.dialect.name == "postgresql":
+        task_hits, comment_hits = _postgres_hits(q)
+    else:
+        task_hits, comment_hits = _sqlite_hits(q)
+
+    accessible = project_ids_for_user_query(user_id)
+    hits = union_all(
+        task_hits.where(Task.project_id.in_(accessible)),
+        comment_hits.where(Task.project_id.in_(accessible)),
+    ).subquery("hits")
+    result = await db.execute(
+        select(hits).order_by(hits.c.rank.desc(), hits.c.kind, hits.c.id).offset(offset).limit(limit + 1)
+    )
+    rows = result.all()
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+    return rows, next_offset
@@ -0,0 +1,128 @@
+import asyncio
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SessionLocal, dispose_engines
+from app.models import ProjectTaskCount, Task, TaskStatus, UNASSIGNED
+
+# Per-project task counts keyed on (project_id, status, assigned_to). Every task write
+# applies its delta in the same transaction, so reading a summary never scans tasks.
+# Recompute everything from the tasks table with:
+#   python -m app.repositories.summary [project_id ...]
+
+SummaryKey = Tuple[int, TaskStatus, int]
+
+
+def summary_key(project_id: int, status, assigned_to: Optional[int]) -> SummaryKey:
+    return project_id, TaskStatus(status or TaskStatus.TO_DO), assigned_to or UNASSIGNED
+
+def task_key(task: Task) -> SummaryKey:
+    return summary_key(task.project_id, task.status, task.assigned_to)
+
+def _upsert(dialect: str):
+    if dialect == "postgresql":
+        return postgresql.insert(ProjectTaskCount)
+    return sqlite.insert(ProjectTaskCount)
+
+async def apply_deltas(db: AsyncSession, deltas: Dict[SummaryKey, int]) -> None:
+    rows = [
+        {"project_id": project_id, "status": status, "assigned_to": assigned_to, "count": delta}
+        for (project_id, status, assigned_to), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    stmt = _upsert(db.bind.dialect.name).values(rows)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[ProjectTaskCount.project_id, ProjectTaskCount.status, ProjectTaskCount.assigned_to],
+        set_={"count": ProjectTaskCount.count + stmt.excluded.count},
+    ))
+
+async def record_created(db: AsyncSession, tasks: Iterable[Task]) -> None:
+    await apply_deltas(db, Counter(task_key(task) for task in tasks))
+
+async def record_deleted(db: AsyncSession, keys: Iterable[SummaryKey]) -> None:
+    deltas = Counter()
+    deltas.subtract(keys)
+    await apply_deltas(db, deltas)
+
+async def record_moved(db: AsyncSession, moves: Iterable[Tuple[SummaryKey, SummaryKey]]) -> None:
+    deltas = Counter()
+    for old, new in moves:
+        if old != new:
+            deltas[old] -= 1
+            deltas[new] += 1
+    await apply_deltas(db, deltas)
+
+async def get_counts(db: AsyncSession, project_id: int) -> List[ProjectTaskCount]:
+    result = await db.execute(
+        select(ProjectTaskCount).where(ProjectTaskCount.project_id == project_id, ProjectTaskCount.count > 0)
+    )
+    return result.scalars().all()
+
+async def get_overdue_counts(db: AsyncSession, project_id: int) -> Dict[int, int]:
+    # overdue depends on the clock, so it is counted from the (project_id, due_date) index
+    # and only ever touches tasks that are already past due
+    result = await db.execute(
+        select(func.coalesce(Task.assigned_to, UNASSIGNED), func.count())
+        .where(
+            Task.project_id == project_id,
+            Task.due_date < datetime.now(timezone.utc),
+            Task.status != TaskStatus.DONE,
+        )
+        .group_by(func.coalesce(Task.assigned_to, UNASSIGNED))
+    )
+    return dict(result.all())
+
+async def get_summary(db: AsyncSession, project_id: int) -> dict:
+    overdue = await get_overdue_counts(db, project_id)
+    by_status = {status: 0 for status in TaskStatus}
+    assignees = {}
+    for row in await get_counts(db, project_id):
+        by_status[row.status] += row.count
+        assignee = assignees.setdefault(row.assigned_to, {
+            "assigned_to": row.assigned_to or None,
+            "total": 0,
+            "overdue": overdue.get(row.assigned_to, 0),
+            "by_status": {status: 0 for status in TaskStatus},
+        })
+        assignee["by_status"][row.status] += row.count
+        assignee["total"] += row.count
+    return {
+        "project_id": project_id,
+        "total": sum(by_status.values()),
+        "overdue": sum(overdue.values()),
+        "by_status": by_status,
+        "by_assignee": list(assignees.values()),
+    }
+
+async def rebuild(db: AsyncSession, project_ids: Optional[List[int]] = None) -> None:
+    clear = delete(ProjectTaskCount)
+    counts = select(
+        Task.project_id,
+        Task.status,
+        func.coalesce(Task.assigned_to, UNASSIGNED),
+        func.count(),
+    ).group_by(Task.project_id, Task.status, func.coalesce(Task.assigned_to, UNASSIGNED))
+    if project_ids:
+        clear = clear.where(ProjectTaskCount.project_id.in_(project_ids))
+        counts = counts.where(Task.project_id.in_(project_ids))
+    await db.execute(clear)
+    await db.execute(insert(ProjectTaskCount).from_select(
+        ["project_id", "status", "assigned_to", "count"], counts
+    ))
+    await db.commit()
+
+async def _main(project_ids: List[int]) -> None:
+    async with SessionLocal() as db:
+        await rebuild(db, project_ids or None)
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main([int(arg) for arg in sys.argv[1:]]))
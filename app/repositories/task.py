@@ -0,0 +1,184 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, delete, insert, select, tuple_, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.pagination import DEFAULT_LIMIT, paginate
+from app.models import ArchivedTask, Comment, Project, Task, TeamMembership
+from app.repositories import summary as summary_repo
+
+
+def tasks_for_user_query(
+    user_id: int,
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    model=Task,
+) -> Select:
+    # model=ArchivedTask builds the same query over the archive table
+    query = select(model)
+    if project_id:
+        query = query.where(model.project_id == project_id)
+    if status:
+        query = query.where(model.status == status)
+
+    # only tasks in projects of teams the user belongs to
+    query = query.join(Project, Project.id == model.project_id)\
+        .join(TeamMembership, TeamMembership.team_id == Project.team_id)\
+        .where(TeamMembership.user_id == user_id)
+    return query
+
+def with_archived(query: Select, archived: Select, columns: List):
+    # archived tasks have no ORM entity of their own: both tables are read as column
+    # rows, and the union is paginated through its columns
+    union = union_all(
+        query.with_only_columns(*columns),
+        archived.with_only_columns(*(getattr(ArchivedTask, column.key).label(column.key) for column in columns)),
+    ).subquery("tasks_with_archive")
+    return select(union), union.c
+
+async def list_tasks_for_user(
+    db: AsyncSession,
+    user_id: int,
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    columns: Optional[List] = None,
+    include_archived: bool = False,
+) -> Tuple[List[Task], Optional[str]]:
+    query = tasks_for_user_query(user_id, project_id=project_id, status=status)
+    if include_archived:
+        archived = tasks_for_user_query(user_id, project_id=project_id, status=status, model=ArchivedTask)
+        query, keys = with_archived(query, archived, columns)
+        return await paginate(db, query, keys, limit, cursor)
+    if columns:
+        query = query.with_only_columns(*columns)
+    return await paginate(db, query, Task, limit, cursor)
+
+async def get_task(db: AsyncSession, task_id: int, *options) -> Optional[Task]:
+    return await db.get(Task, task_id, options=options)
+
+async def get_task_for_delete(db: AsyncSession, task_id: int) -> Optional[Task]:
+    return await get_task(db, task_id, selectinload(Task.comments))
+
+async def get_task_with_team_id(db: AsyncSession, task_id: int, columns: Optional[List] = None) -> Tuple[Optional[Task], Optional[int]]:
+    # the owning team is needed for every authorization check, fetch it in the same query;
+    # with `columns` the task is returned as a plain row of just those columns
+    selected = (*columns, Project.team_id) if columns else (Task, Project.team_id)
+    result = await db.execute(
+        select(*selected).join(Project, Project.id == Task.project_id).where(Task.id == task_id)
+    )
+    row = result.first()
+    if not row:
+        return None, None
+    return (row, row.team_id) if columns else (row[0], row[1])
+
+async def create_task(db: AsyncSession, values: dict, created_by: int) -> Task:
+    task = Task(**values, created_by=created_by)
+    db.add(task)
+    await db.flush()
+    await summary_repo.record_created(db, [task])
+    await db.commit()
+    await db.refresh(task)
+    return task
+
+def _with_due_notices(values: dict) -> dict:
+    # a new due date gets its own reminder and overdue notices (see app.core.scheduler)
+    if "due_date" in values:
+        return dict(values, due_reminded=False, overdue=False)
+    return values
+
+async def update_task(db: AsyncSession, task: Task, values: dict) -> Task:
+    old_key = summary_repo.task_key(task)
+    values = _with_due_notices(values)
+    for key, value in values.items():
+        setattr(task, key, value)
+    await summary_repo.record_moved(db, [(old_key, summary_repo.task_key(task))])
+    await db.commit()
+    await db.refresh(task)
+    return task
+
+async def delete_task(db: AsyncSession, task: Task) -> None:
+    await summary_repo.record_deleted(db, [summary_repo.task_key(task)])
+    await db.delete(task)
+    await db.commit()
+
+async def get_tasks_by_ids(db: AsyncSession, task_ids: List[int], columns: Optional[List] = None) -> List[Task]:
+    # with `columns` the tasks are returned as plain rows of just those columns
+    query = select(*columns) if columns else select(Task)
+    result = await db.execute(query.where(Task.id.in_(task_ids)))
+    return result.all() if columns else result.scalars().all()
+
+async def bulk_create_tasks(db: AsyncSession, rows: List[dict], created_by: int) -> List[Task]:
+    if not rows:
+        return []
+    # one multi-row INSERT ... RETURNING, rows come back in parameter order
+    result = await db.scalars(
+        insert(Task).returning(Task, sort_by_parameter_order=True),
+        [dict(row, created_by=created_by) for row in rows],
+    )
+    tasks = result.all()
+    await summary_repo.record_created(db, tasks)
+    await db.commit()
+    return tasks
+
+def _key_columns(ids: List[int]) -> Select:
+    return select(Task.id, Task.project_id, Task.status, Task.assigned_to, Task.version).where(Task.id.in_(ids))
+
+async def bulk_update_tasks(
+    db: AsyncSession, changes: List[Tuple[dict, List[int]]], versions: Dict[int, int]
+) -> Dict[int, Task]:
+    """Apply `changes` to the tasks still at their version in `versions` (as the caller read them).
+
+    Tasks changed or deleted since are left alone and missing from the result.
+    """
+    task_ids = list(dict.fromkeys(task_id for _, ids in changes for task_id in ids))
+    if not task_ids:
+        return {}
+    # locked until commit, so a concurrent PATCH cannot move a task to another summary key
+    # between this read and the updates below
+    old_keys, expected = {}, {}
+    for row in await db.execute(_key_columns(task_ids).with_for_update()):
+        if row.version == versions.get(row.id):
+            old_keys[row.id] = summary_repo.summary_key(row.project_id, row.status, row.assigned_to)
+            expected[row.id] = row.version
+    # each distinct set of values is applied to all its task ids with a single UPDATE, guarded
+    # by version like the ORM path; Core updates bypass the ORM version counter, so bump it here
+    for values, ids in changes:
+        ids = [task_id for task_id in ids if task_id in expected]
+        if values and ids:
+            result = await db.execute(
+                update(Task).where(tuple_(Task.id, Task.version).in_([(task_id, expected[task_id]) for task_id in ids]))
+                .values(**_with_due_notices(values), version=Task.version + 1).returning(Task.id)
+                .execution_options(synchronize_session=False)
+            )
+            updated = set(result.scalars().all())
+            for task_id in ids:
+                if task_id in updated:
+                    expected[task_id] += 1
+                else:
+                    del old_keys[task_id], expected[task_id]
+    if not expected:
+        # ends the transaction, releasing the locks
+        await db.commit()
+        return {}
+    result = await db.execute(
+        select(Task).where(Task.id.in_(list(expected))).execution_options(populate_existing=True)
+    )
+    tasks = {task.id: task for task in result.scalars()}
+    await summary_repo.record_moved(db, [(old_keys[task.id], summary_repo.task_key(task)) for task in tasks.values()])
+    await db.commit()
+    return tasks
+
+async def bulk_delete_tasks(db: AsyncSession, task_ids: List[int]) -> None:
+    if not task_ids:
+        return
+    await db.execute(delete(Comment).where(Comment.task_id.in_(task_ids)))
+    deleted = await db.execute(
+        delete(Task).where(Task.id.in_(task_ids))
+        .returning(Task.project_id, Task.status, Task.assigned_to)
+        .execution_options(synchronize_session=False)
+    )
+    await summary_repo.record_deleted(db, [summary_repo.summary_key(*row) for row in deleted])
+    await db.commit()
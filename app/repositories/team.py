@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.cache import MISSING, cache_membership, invalidate_membership, membership_cache
+from app.core.pagination import DEFAULT_LIMIT, paginate
+from app.models import Team, TeamMembership
+
+
+def teams_query() -> Select:
+    # TeamOut serializes members, which cannot be lazy loaded on an AsyncSession
+    return select(Team).options(selectinload(Team.members))
+
+async def list_teams(
+    db: AsyncSession,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Team], Optional[str]]:
+    return await paginate(db, teams_query(), Team, limit, cursor)
+
+async def get_team(db: AsyncSession, team_id: int) -> Optional[Team]:
+    result = await db.execute(
+        teams_query().where(Team.id == team_id).execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def create_team(db: AsyncSession, name: str, created_by: int) -> Team:
+    team = Team(name=name, created_by=created_by)
+    db.add(team)
+    await db.commit()
+    return await get_team(db, team.id)
+
+async def update_team(db: AsyncSession, team: Team, values: dict) -> Team:
+    for key, value in values.items():
+        setattr(team, key, value)
+    await db.commit()
+    return await get_team(db, team.id)
+
+async def get_team_ids_for_user(db: AsyncSession, user_id: int) -> List[int]:
+    result = await db.execute(select(TeamMembership.team_id).where(TeamMembership.user_id == user_id))
+    return result.scalars().all()
+
+async def get_member_role(db: AsyncSession, team_id: int, user_id: int) -> Optional[str]:
+    role = membership_cache.get((user_id, team_id))
+    if role is not MISSING:
+        return role
+    result = await db.execute(
+        select(func.coalesce(TeamMembership.role, "member")).where(
+            TeamMembership.team_id == team_id,
+            TeamMembership.user_id == user_id,
+        )
+    )
+    role = result.scalar_one_or_none()
+    cache_membership(user_id, team_id, role)
+    return role
+
+async def get_member_roles(db: AsyncSession, keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Optional[str]]:
+    # (user_id, team_id) -> role, like get_member_role for many pairs in one query
+    roles = {key: membership_cache.get(key) for key in keys}
+    missing = [key for key, role in roles.items() if role is MISSING]
+    if missing:
+        result = await db.execute(
+            select(TeamMembership.user_id, TeamMembership.team_id, func.coalesce(TeamMembership.role, "member")).where(
+                TeamMembership.user_id.in_({user_id for user_id, _ in missing}),
+                TeamMembership.team_id.in_({team_id for _, team_id in missing}),
+            )
+        )
+        found = {(user_id, team_id): role for user_id, team_id, role in result}
+        for key in missing:
+            roles[key] = found.get(key)
+            cache_membership(*key, roles[key])
+    return roles
+
+async def add_member(db: AsyncSession, team_id: int, user_id: int, role: Optional[str] = None) -> TeamMembership:
+    membership = TeamMembership(team_id=team_id, user_id=user_id, role=role or "member")
+    db.add(membership)
+    # the member list is part of the team representation, so it gets a new version (ETag)
+    await db.execute(
+        update(Team).where(Team.id == team_id).values(version=Team.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    invalidate_membership(user_id, team_id)
+    await db.refresh(membership)
+    return membership
@@ -0,0 +1,147 @@
+from collections import Counter
+from typing import AsyncIterator, List, Tuple, Union
+
+from sqlalchemy import Select, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pagination import STREAM_CHUNK_SIZE
+from app.core.transfer import ImportItem, LineError
+from app.database import SessionLocal
+from app.models import Comment, Task, TaskPriority, TaskStatus, User
+from app.repositories import summary as summary_repo
+from app.schemas import ImportLineError, ImportResult
+
+MAX_IMPORT_ERRORS = 100
+
+
+def export_query(project_id: int) -> Select:
+    # one row per comment (or per task without comments), grouped by task
+    return (
+        select(
+            Task.id, Task.title, Task.description, Task.status, Task.priority, Task.assigned_to,
+            Task.due_date, Task.created_by, Task.created_at,
+            Comment.id.label("comment_id"), Comment.content.label("comment_content"),
+            Comment.user_id.label("comment_user_id"), Comment.created_at.label("comment_created_at"),
+        )
+        .outerjoin(Comment, Comment.task_id == Task.id)
+        .where(Task.project_id == project_id)
+        .order_by(Task.id, Comment.created_at, Comment.id)
+    )
+
+async def stream_export(db: AsyncSession, project_id: int) -> AsyncIterator:
+    # a server-side cursor; the request session may be closed before the body is sent, so
+    # this opens its own on the engine get_db routed the request to
+    async with SessionLocal(bind=db.bind) as session:
+        result = await session.stream(export_query(project_id).execution_options(yield_per=STREAM_CHUNK_SIZE))
+        async for row in result:
+            yield row
+
+
+def _task_values(item: ImportItem, project_id: int, user_id: int) -> dict:
+    values = item.task.dict(exclude={"comments"})
+    # an explicit null takes the column default, as the summary counts assume
+    values["status"] = values["status"] or TaskStatus.TO_DO
+    values["priority"] = values["priority"] or TaskPriority.MEDIUM
+    return dict(values, project_id=project_id, created_by=user_id)
+
+async def _unknown_assignees(db: AsyncSession, batch: List[ImportItem]) -> set:
+    assignees = {item.task.assigned_to for item in batch if item.task.assigned_to is not None}
+    if not assignees:
+        return set()
+    result = await db.execute(select(User.id).where(User.id.in_(assignees)))
+    return assignees - set(result.scalars().all())
+
+async def _insert_rows(db: AsyncSession, tasks: List[dict], comments_of: List[list], user_id: int) -> None:
+    # chunked multi-row INSERTs; task ids come back in parameter order for the comments
+    result = await db.execute(insert(Task).returning(Task.id, sort_by_parameter_order=True), tasks)
+    comments = [
+        {"task_id": task_id, "user_id": user_id, "content": comment.content}
+        for task_id, task_comments in zip(result.scalars().all(), comments_of)
+        for comment in task_comments
+    ]
+    if comments:
+        await db.execute(insert(Comment), comments)
+
+async def _copy_rows(db: AsyncSession, tasks: List[dict], comments_of: List[list], user_id: int) -> None:
+    # Postgres: reserve the ids up front, then COPY both tables over the session's connection
+    # (and so inside its transaction); omitted columns take their server defaults
+    result = await db.execute(
+        text("SELECT nextval(pg_get_serial_sequence('tasks', 'id')) FROM generate_series(1, :count)"),
+        {"count": len(tasks)},
+    )
+    task_ids = result.scalars().all()
+    connection = await (await db.connection()).get_raw_connection()
+    driver = connection.driver_connection
+    task_columns = ["id", "title", "description", "status", "priority", "assigned_to", "due_date", "project_id", "created_by"]
+    await driver.copy_records_to_table("tasks", columns=task_columns, records=[
+        (
+            task_id, task["title"], task["description"],
+            # the enum types are labelled with the member names
+            TaskStatus(task["status"]).name, TaskPriority(task["priority"]).name,
+            task["assigned_to"], task["due_date"], task["project_id"], task["created_by"],
+        )
+        for task_id, task in zip(task_ids, tasks)
+    ])
+    comments = [
+        (task_id, user_id, comment.content)
+        for task_id, task_comments in zip(task_ids, comments_of)
+        for comment in task_comments
+    ]
+    if comments:
+        await driver.copy_records_to_table("comments", columns=["task_id", "user_id", "content"], records=comments)
+
+async def _import_batch(db: AsyncSession, batch: List[ImportItem], project_id: int, user_id: int) -> Tuple[int, int]:
+    tasks = [_task_values(item, project_id, user_id) for item in batch]
+    comments_of = [item.task.comments for item in batch]
+    if db.bind.dialect.driver == "asyncpg":
+        await _copy_rows(db, tasks, comments_of, user_id)
+    else:
+        await _insert_rows(db, tasks, comments_of, user_id)
+    await summary_repo.apply_deltas(db, Counter(
+        summary_repo.summary_key(project_id, task["status"], task["assigned_to"]) for task in tasks
+    ))
+    await db.commit()
+    return len(tasks), sum(map(len, comments_of))
+
+async def import_tasks(
+    db: AsyncSession,
+    project_id: int,
+    user_id: int,
+    items: AsyncIterator[Union[ImportItem, LineError]],
+) -> ImportResult:
+    """Insert parsed tasks (and their comments) a batch per transaction.
+
+    Lines that fail validation are reported and skipped; a failure part way leaves
+    the batches before it imported.
+    """
+    result = ImportResult(tasks=0, comments=0, failed=0, errors=[])
+
+    def reject(line: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < MAX_IMPORT_ERRORS:
+            result.errors.append(ImportLineError(line=line, error=error))
+
+    async def flush(batch: List[ImportItem]) -> None:
+        unknown = await _unknown_assignees(db, batch)
+        for item in batch:
+            if item.task.assigned_to in unknown:
+                reject(item.line, f"assigned_to: user {item.task.assigned_to} not found")
+        batch = [item for item in batch if item.task.assigned_to not in unknown]
+        if batch:
+            tasks, comments = await _import_batch(db, batch, project_id, user_id)
+            result.tasks += tasks
+            result.comments += comments
+
+    batch: List[ImportItem] = []
+    async for item in items:
+        if isinstance(item, LineError):
+            reject(item.line, item.error)
+            continue
+        batch.append(item)
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    return result
@@ -0,0 +1,63 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import MISSING, invalidate_user, user_cache
+from app.models import TeamMembership, User
+
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    user = user_cache.get(user_id)
+    if user is not MISSING:
+        return user
+    user = await db.get(User, user_id)
+    if user is not None:
+        # cached users are shared between requests, so keep them out of any session
+        db.expunge(user)
+        user_cache.set(user_id, user)
+    return user
+
+async def get_users_by_ids(db: AsyncSession, user_ids: List[int]) -> Dict[int, User]:
+    users = {user_id: user_cache.get(user_id) for user_id in user_ids}
+    missing = [user_id for user_id, user in users.items() if user is MISSING]
+    if missing:
+        result = await db.execute(select(User).where(User.id.in_(missing)))
+        for user in result.scalars().all():
+            db.expunge(user)
+            user_cache.set(user.id, user)
+            users[user.id] = user
+    return {user_id: user for user_id, user in users.items() if user is not MISSING}
+
+async def get_visible_user_ids(db: AsyncSession, user_id: int, user_ids: List[int]) -> List[int]:
+    # the user themselves and the members of their teams
+    teams = select(TeamMembership.team_id).where(TeamMembership.user_id == user_id)
+    result = await db.execute(
+        select(TeamMembership.user_id).where(TeamMembership.team_id.in_(teams), TeamMembership.user_id.in_(user_ids))
+        .distinct()
+    )
+    return [user_id, *result.scalars().all()]
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+async def create_user(db: AsyncSession, username: str, email: str, password: str) -> User:
+    user = User(username=username, email=email, password=password)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+async def update_user(db: AsyncSession, user: User, values: dict) -> User:
+    user = await db.merge(user)
+    for key, value in values.items():
+        setattr(user, key, value)
+    await db.commit()
+    invalidate_user(user.id)
+    await db.refresh(user)
+    return user
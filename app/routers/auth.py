@@ -1,30 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.schemas.user import UserCreate, UserLogin, UserLogOut
-from app.models.user import User
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.user import UserCreate, UserLogin, UserOut
 from app.database import get_db
-from app.core.security import hash_password, create_access_token, verify_password
+from app.repositories import user as user_repo
+from app.core.cache import auth_cache_stats
+from app.core.security import (
+    create_access_token, get_current_user, hash_password_async, needs_rehash,
+    password_hash_pool, verify_password_async,
+)
 from datetime import timedelta
 
 router = APIRouter(prefix='/auth', tags=['Authentication'])
 
-@router.post('/register', response_model=UserLogOut)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.username == user.username).first():
+@router.post('/register', response_model=UserOut)
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    if await user_repo.get_user_by_username(db, user.username):
         raise HTTPException(status_code=400, detail="Username already exists")
-    if db.query(User).filter(User.email == user.email).first():
+    if await user_repo.get_user_by_email(db, user.email):
         raise HTTPException(status_code=400, detail="Email already exists")
-    hashed = hash_password(user.password)
-    new_user = User(username=user.username, email=user.email, password=hashed)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    hashed = await hash_password_async(user.password)
+    return await user_repo.create_user(db, username=user.username, email=user.email, password=hashed)
 
 @router.post('/login')
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if not db_user or not verify_password(user.password, db_user.password):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
+    db_user = await user_repo.get_user_by_username(db, user.username)
+    if not db_user or not await verify_password_async(user.password, db_user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    # transparently upgrade hashes made with a different cost
+    if needs_rehash(db_user.password):
+        await user_repo.update_user(db, db_user, {"password": await hash_password_async(user.password)})
     token = create_access_token(data={"sub": str(db_user.id)}, expires_delta=timedelta(minutes=30))
-    return {"access_token": token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": token, "token_type": "bearer"}
+
+@router.get('/stats')
+async def auth_stats(current_user = Depends(get_current_user)):
+    return {"cache": auth_cache_stats(), "password_hashing": password_hash_pool.stats()}
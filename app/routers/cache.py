@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+
+from app.core.cache import auth_cache_stats
+from app.core.response_cache import response_cache
+from app.core.security import get_current_user
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+@router.get("/stats")
+async def cache_stats(current_user = Depends(get_current_user)):
+    return {"responses": await response_cache.stats(), "auth": auth_cache_stats()}
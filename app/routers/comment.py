@@ -1,63 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from app import models, schemas
 from app.models import User
 from app.database import get_db
+from app.core.activity import activity_log
+from app.core.events import publish_change
+from app.core.pagination import DEFAULT_LIMIT, MAX_LIMIT, stream_ndjson
+from app.core.response_cache import cache_key, cached_page, response_cache, task_tag, user_tag
 from app.core.security import get_current_user
+from app.core.serialization import parse_fields, select_columns
+from app.repositories import comment as comment_repo, task as task_repo
 
 router = APIRouter(
     prefix="/comments",
     tags=["comments"]
 )
 
-@router.get("/", response_model=List[schemas.CommentOut])
+@router.get("/", response_model=schemas.Page[schemas.CommentOut])
 async def get_comments(
     task_id: int,
-    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated CommentOut fields to return"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    fields = parse_fields(schemas.CommentOut, fields)
+
+    async def load():
+        task = await task_repo.get_task(db, task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return await comment_repo.list_comments(
+            db, task_id, limit=limit, cursor=cursor, columns=select_columns(models.Comment, schemas.CommentOut, fields)
+        )
+
+    if stream:
+        task = await task_repo.get_task(db, task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return stream_ndjson(db, comment_repo.comments_query(task_id), models.Comment, schemas.CommentOut, cursor, fields)
 
-    comments = db.query(models.Comment).filter(models.Comment.task_id == task_id).all() 
-    return comments
+    # a cached page implies the task still exists: deleting or archiving it invalidates the
+    # task tag. Entries are per user, like the other lists, and go with the user's memberships
+    key = cache_key("comments", current_user.id, task_id, limit, cursor, fields)
+    tags = [task_tag(task_id), user_tag(current_user.id)]
+    return await cached_page(key, tags, models.Comment, schemas.CommentOut, load, if_none_match, fields)
 
 @router.post("/", response_model=schemas.CommentOut, status_code=status.HTTP_201_CREATED)
 async def create_comment(
     comment: schemas.CommentCreate,
     task_id : int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    task = await task_repo.get_task(db, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    new_comment = models.Comment(
-        content=comment.content,
-        task_id = task_id,
-        user_id = current_user.id
-    )
-    db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
+    new_comment = await comment_repo.create_comment(db, task_id=task_id, user_id=current_user.id, content=comment.content)
+    await response_cache.invalidate(task_tag(task_id))
+    publish_change("comment.created", task.project_id, task_id, jsonable_encoder(schemas.CommentOut.from_orm(new_comment)))
+    await activity_log.record("comment.created", current_user.id, task.project_id, task_id=task_id, comment_id=new_comment.id)
     return new_comment
 
-router.delete("/{comment_id}", response_model=schemas.CommentOut, status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_comment(
         comment_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
+    comment = await comment_repo.get_comment(db, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     
     if current_user.id != comment.user_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
 
-    db.delete(comment)
-    db.commit()
-    return {"detail": "Comment deleted successfully"}
\ No newline at end of file
+    task = await task_repo.get_task(db, comment.task_id)
+    await comment_repo.delete_comment(db, comment)
+    await response_cache.invalidate(task_tag(comment.task_id))
+    publish_change("comment.deleted", task.project_id, comment.task_id, {"id": comment.id, "task_id": comment.task_id})
+    await activity_log.record("comment.deleted", current_user.id, task.project_id, task_id=comment.task_id, comment_id=comment.id)
+    return {"detail": "Comment deleted successfully"}
@@ -0,0 +1,113 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, WebSocket, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+from app.database import SessionLocal, get_db
+from app.core.config import settings
+from app.core.events import Event, broker, project_topic, task_topic
+from app.core.security import authenticate_token, get_current_user
+from app.repositories import project as project_repo, task as task_repo, team as team_repo
+
+router = APIRouter(
+    prefix="/events",
+    tags=["events"]
+)
+
+async def _authorize_topic(db: AsyncSession, user: User, project_id: Optional[int], task_id: Optional[int]) -> str:
+    if (project_id is None) == (task_id is None):
+        raise HTTPException(status_code=400, detail="Subscribe to exactly one of project_id or task_id")
+    if project_id is not None:
+        project = await project_repo.get_project(db, project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if not await project_repo.can_access(db, project, user.id):
+            raise HTTPException(status_code=403, detail="Not authorized to access this project")
+        return project_topic(project_id)
+    task, team_id = await task_repo.get_task_with_team_id(db, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not await team_repo.get_member_role(db, team_id, user.id):
+        raise HTTPException(status_code=403, detail="Not authorized to access this task")
+    return task_topic(task_id)
+
+def _sse(event: Event) -> str:
+    return f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+
+@router.get("/stream")
+async def stream_events(
+    project_id: Optional[int] = None,
+    task_id: Optional[int] = None,
+    last_event_id: Optional[int] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    topic = await _authorize_topic(db, current_user, project_id, task_id)
+    # do not hold a pooled connection for the lifetime of the stream
+    await db.close()
+    subscription = broker.subscribe(topic, last_event_id)
+
+    async def frames():
+        try:
+            while True:
+                event = await subscription.get(settings.EVENT_HEARTBEAT_SECONDS)
+                if event is not None:
+                    yield _sse(event)
+                elif subscription.dropped:
+                    yield "event: dropped\ndata: {}\n\n"
+                    return
+                else:
+                    yield ": heartbeat\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(frames(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    token: str,
+    project_id: Optional[int] = None,
+    task_id: Optional[int] = None,
+    last_event_id: Optional[int] = None,
+):
+    # browsers cannot set headers on a WebSocket handshake, so the token comes in the query
+    try:
+        async with SessionLocal() as db:
+            user = await authenticate_token(token, db)
+            topic = await _authorize_topic(db, user, project_id, task_id)
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail))
+        return
+
+    await websocket.accept()
+    subscription = broker.subscribe(topic, last_event_id)
+
+    async def send_events():
+        while True:
+            event = await subscription.get(settings.EVENT_HEARTBEAT_SECONDS)
+            if event is not None:
+                await websocket.send_json({"id": event.id, "type": event.type, "data": event.data})
+            elif subscription.dropped:
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="dropped")
+                return
+            else:
+                await websocket.send_json({"type": "heartbeat"})
+
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    # whichever finishes first (client gone, subscriber dropped, send failed) ends the session
+    tasks = [asyncio.ensure_future(send_events()), asyncio.ensure_future(wait_for_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        subscription.close()
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app import schemas
+from app.core.jobs import jobs
+from app.core.security import get_current_user
+from app.models import User
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/{job_id}", response_model=schemas.JobOut)
+async def get_job(job_id: str, current_user: User = Depends(get_current_user)):
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this job")
+    return job
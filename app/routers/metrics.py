@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.activity import activity_log
+from app.core.admission import admission
+from app.core.cache import user_cache, membership_cache
+from app.core.instrumentation import render_metrics
+from app.core.jobs import jobs
+from app.core.response_cache import response_cache
+from app.core.scheduler import due_scheduler
+from app.core.security import password_hash_pool
+from app.database import all_engines, replicas
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheus text format; scraped without auth, so it exposes no per-user data
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    hashing = password_hash_pool.stats()
+    lanes = admission.lanes.values()
+    due = due_scheduler.stats()
+    activity = activity_log.stats()
+    gauges = {
+        **{f'admission_in_flight{{lane="{lane.name}"}}': lane.in_flight for lane in lanes},
+        **{f'admission_queue_depth{{lane="{lane.name}"}}': lane.waiting for lane in lanes},
+        "password_hash_in_flight": hashing["in_flight"],
+        "password_hash_waiting": hashing["waiting"],
+        "background_jobs_running": jobs.stats()["running"],
+        "activity_log_queued": activity["queued"],
+        "due_scheduler_leading": due["leading"],
+        "due_scheduler_queued": due["queued"],
+        **{f'db_replica_healthy{{engine="{name}"}}': int(healthy) for name, healthy in replicas.healthy.items()},
+    }
+    return render_metrics(all_engines(), gauges, {
+        "password_hash_rejected_total": hashing["rejected"],
+        **{f'admission_rejected_total{{lane="{lane.name}"}}': lane.rejected for lane in lanes},
+        **{f'rate_limited_total{{key="{key}"}}': count for key, count in admission.rate_limited.items()},
+        "activity_log_written_total": activity["written"],
+        "activity_log_dropped_total": activity["dropped"],
+        "due_reminders_total": due["reminders"],
+        "due_overdue_total": due["overdue"],
+        "auth_user_cache_hits_total": user_cache.hits,
+        "auth_user_cache_misses_total": user_cache.misses,
+        "auth_membership_cache_hits_total": membership_cache.hits,
+        "auth_membership_cache_misses_total": membership_cache.misses,
+        "response_cache_hits_total": response_cache.hits,
+        "response_cache_misses_total": response_cache.misses,
+    })
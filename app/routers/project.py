@@ -1,64 +1,219 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 from app.database import get_db
-from app.models import project as models
-from app.schemas import project as schemas
+from app import models, schemas
 from app.models.user import User
+from app.core.activity import activity_log
+from app.core.etag import check_if_match, etag_matches, not_modified, row_etag, versioned_write
+from app.core.pagination import DEFAULT_LIMIT, MAX_LIMIT, stream_ndjson
+from app.core import transfer
+from app.core.config import settings
+from app.core.jobs import job_accepted, jobs
+from app.core.response_cache import (
+    cache_key, cached_page, deleted_tree_tags, project_tag, response_cache, task_tag, team_tag, user_tag,
+)
 from app.core.security import get_current_user
+from app.core.serialization import parse_fields, select_columns
+from app.repositories import (
+    activity as activity_repo, deletion as deletion_repo, project as project_repo, summary as summary_repo,
+    team as team_repo, transfer as transfer_repo,
+)
 
 router = APIRouter(prefix='/projects', tags=["projects"])
 
-@router.get("/", response_model=List[schemas.ProjectOut])
-def get_projects(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=schemas.Page[schemas.ProjectOut])
+async def get_projects(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated ProjectOut fields to return"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    projects = db.query(models.Project).join(models.Team).join(models.Team.members).filter((models.Project.owner_id == current_user.id) | (models.Team.members.any(id=current_user.id))).all()
-    return projects
+    fields = parse_fields(schemas.ProjectOut, fields)
+    if stream:
+        query = project_repo.projects_for_user_query(current_user.id)
+        return stream_ndjson(db, query, models.Project, schemas.ProjectOut, cursor, fields)
+
+    tags = [user_tag(current_user.id)]
+
+    async def load():
+        # project writes invalidate their team, so the page depends on every team the user is in
+        tags.extend(team_tag(team_id) for team_id in await team_repo.get_team_ids_for_user(db, current_user.id))
+        return await project_repo.list_projects_for_user(
+            db, current_user.id, limit=limit, cursor=cursor,
+            columns=select_columns(models.Project, schemas.ProjectOut, fields),
+        )
+
+    key = cache_key("projects", current_user.id, limit, cursor, fields)
+    return await cached_page(key, tags, models.Project, schemas.ProjectOut, load, if_none_match, fields)
 
 @router.post("/", response_model=schemas.ProjectOut, status_code=status.HTTP_201_CREATED)
-def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    new_project = models.Project(**project.dict(), owner_id=current_user.id)
-    db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+async def create_project(project: schemas.ProjectCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    new_project = await project_repo.create_project(db, project.dict(), owner_id=current_user.id)
+    await response_cache.invalidate(team_tag(new_project.team_id), user_tag(new_project.owner_id))
+    await activity_log.record("project.created", current_user.id, new_project.id, name=new_project.name)
     return new_project
 
 @router.get("/{project_id}", response_model=schemas.ProjectOut)
-def get_project(project_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+async def get_project(
+    project_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    project = await project_repo.get_project(db, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    if project.owner_id != current_user.id and current_user.id not in project.team.members:
+    if not await project_repo.can_access(db, project, current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized to access this project")
+    etag = row_etag(project)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return project
 
+@router.get("/{project_id}/summary", response_model=schemas.ProjectSummary)
+async def get_project_summary(project_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    project = await project_repo.get_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not await project_repo.can_access(db, project, current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized to access this project")
+    return await summary_repo.get_summary(db, project_id)
+
+@router.get("/{project_id}/activity", response_model=schemas.Page[schemas.ActivityOut])
+async def get_project_activity(
+    project_id: int,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # in the order entries were written, which is behind the requests that made them, a second
+    # or so later: by created_at the feed is only eventually ordered
+    project = await project_repo.get_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not await project_repo.can_access(db, project, current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized to access this project")
+    items, next_cursor = await activity_repo.list_activity(db, project_id, limit=limit, cursor=cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/{project_id}/export")
+async def export_project(
+    project_id: int,
+    format: str = Query(transfer.NDJSON, description="ndjson or csv"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    format = transfer.format_for(format, None)
+    project = await project_repo.get_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not await project_repo.can_access(db, project, current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized to access this project")
+    return StreamingResponse(
+        transfer.export_lines(transfer_repo.stream_export(db, project_id), format),
+        media_type=transfer.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}.{format}"'},
+    )
+
+@router.post("/{project_id}/import", response_model=schemas.ImportResult)
+async def import_project(
+    project_id: int,
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or csv; defaults from the Content-Type"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # the body is read as a stream, not parsed as JSON: send the file itself as the request body
+    format = transfer.format_for(format, request.headers.get("content-type"))
+    project = await project_repo.get_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if await team_repo.get_member_role(db, project.team_id, current_user.id) not in ["admin", "member"]:
+        raise HTTPException(status_code=403, detail="Not authorized to create tasks for this project")
+
+    result = await transfer_repo.import_tasks(
+        db, project_id, current_user.id, transfer.import_items(request.stream(), format)
+    )
+    if result.tasks:
+        await response_cache.invalidate(project_tag(project_id))
+        await activity_log.record(
+            "project.imported", current_user.id, project_id, tasks=result.tasks, comments=result.comments
+        )
+    return result
+
 @router.patch("/{project_id}", response_model=schemas.ProjectOut)
-def update_project(project_id: int, update_data: schemas.ProjectUpdate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+async def update_project(
+    project_id: int,
+    update_data: schemas.ProjectUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    project = await project_repo.get_project(db, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if project.owner_id != current_user.id and current_user.id not in project.team.members:
+    if not await project_repo.can_access(db, project, current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized to update this project")
-    
-    for key, value in update_data.dict(exclude_unset=True).items():
-        setattr(project, key, value)
-    db.commit()
-    db.refresh(project)
+
+    check_if_match(if_match, row_etag(project))
+    old_team_id = project.team_id
+    values = update_data.dict(exclude_unset=True)
+    with versioned_write(if_match):
+        project = await project_repo.update_project(db, project, values)
+    await response_cache.invalidate(
+        project_tag(project.id), team_tag(old_team_id), team_tag(project.team_id), user_tag(project.owner_id)
+    )
+    await activity_log.record("project.updated", current_user.id, project.id, fields=sorted(values))
+    response.headers["ETag"] = row_etag(project)
     return project
 
-@router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(project_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+@router.delete(
+    "/{project_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.JobOut}},
+)
+async def delete_project(
+    project_id: int,
+    background: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    project = await project_repo.get_project(db, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if project.owner_id != current_user.id and current_user.id not in project.team.members:
+    if not await project_repo.can_access(db, project, current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized to delete this project")
-    
-    db.delete(project)
-    db.commit()
-    return {"detail": "Project deleted successfully"}
\ No newline at end of file
+
+    projects = deletion_repo.project_ids_query(project_id=project.id)
+    total = await deletion_repo.count_tasks(db, projects)
+    if background or total > settings.DELETE_BACKGROUND_THRESHOLD:
+        team_id = project.team_id
+
+        async def work(job):
+            async def on_chunk(task_ids):
+                job.advance(len(task_ids))
+                await response_cache.invalidate(project_tag(project_id), *map(task_tag, task_ids))
+
+            tree = await deletion_repo.delete_tree_in_chunks(
+                projects, chunk_size=settings.DELETE_CHUNK_SIZE, on_chunk=on_chunk
+            )
+            job.advance(len(tree.task_ids))
+            await response_cache.invalidate(team_tag(team_id), *deleted_tree_tags(tree))
+
+        return job_accepted(jobs.start("project.delete", project.id, current_user.id, total, work))
+
+    tree = await deletion_repo.delete_project(db, project.id)
+    await response_cache.invalidate(team_tag(project.team_id), *deleted_tree_tags(tree))
+    return {"detail": "Project deleted successfully"}
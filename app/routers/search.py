@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app import schemas
+from app.models import User
+from app.database import get_db
+from app.core.pagination import DEFAULT_LIMIT, MAX_LIMIT, decode_offset, encode_offset
+from app.core.security import get_current_user
+from app.repositories import search as search_repo
+
+router = APIRouter(
+    prefix="/search",
+    tags=["search"]
+)
+
+@router.get("/", response_model=schemas.Page[schemas.SearchHit])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    q = q.strip()
+    if not q:
+        # min_length lets whitespace through, and FTS5 rejects an empty MATCH
+        raise HTTPException(status_code=400, detail="Search query has no terms")
+    hits, next_offset = await search_repo.search(db, current_user.id, q, limit=limit, offset=decode_offset(cursor))
+    return {
+        "items": hits,
+        "next_cursor": encode_offset(next_offset) if next_offset is not None else None,
+    }
@@ -1,123 +1,309 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from app import models, schemas
 from app.models import User
 from app.database import get_db
+from app.core.activity import activity_log
+from app.core.etag import check_if_match, collection_etag, etag_matches, not_modified, row_etag, versioned_write
+from app.core.events import publish_change
+from app.core.loader import Loaders, get_loaders
+from app.core.pagination import DEFAULT_LIMIT, MAX_LIMIT, parse_ids, stream_ndjson
+from app.core.scheduler import due_scheduler
+from app.core.response_cache import cache_key, cached_page, project_tag, response_cache, task_tag, user_tag
 from app.core.security import get_current_user
+from app.core.serialization import json_response, parse_fields, render_item, render_page, select_columns
+from app.repositories import project as project_repo, task as task_repo, team as team_repo
 
 router = APIRouter(
     prefix="/tasks",
     tags=["tasks"]
 )
 
-@router.get("/", response_model=List[schemas.TaskOut])
+def _publish(type: str, task: models.Task) -> None:
+    due_scheduler.task_changed(task.id, task.due_date, task.status)
+    publish_change(type, task.project_id, task.id, jsonable_encoder(schemas.TaskOut.from_orm(task)))
+
+async def _record_changes(actor_id: int, task: models.Task, old_status, old_assignee: Optional[int]) -> None:
+    # the activity log keeps status changes and reassignments, not every field edit
+    if task.status != old_status:
+        await activity_log.record(
+            "task.status_changed", actor_id, task.project_id, task_id=task.id, old=old_status, new=task.status
+        )
+    if task.assigned_to != old_assignee:
+        await activity_log.record(
+            "task.reassigned", actor_id, task.project_id, task_id=task.id, old=old_assignee, new=task.assigned_to
+        )
+
+@router.get("/", response_model=schemas.Page[schemas.TaskOut])
 async def get_tasks(
     project_id: Optional[int] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated TaskOut fields to return"),
+    include_archived: bool = Query(False, description="Also return archived (long done) tasks"),
+    ids: Optional[str] = Query(None, description=f"Comma-separated ids of up to {MAX_LIMIT} tasks to fetch at once"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     current_user: User = Depends(get_current_user)
 ):
-    # start with base query
-    query = db.query(models.Task)
+    fields = parse_fields(schemas.TaskOut, fields)
+    if ids is not None:
+        return await _get_tasks_by_ids(parse_ids(ids), fields, if_none_match, db, loaders, current_user)
+    if include_archived:
+        if stream:
+            raise HTTPException(status_code=400, detail="include_archived cannot be streamed")
+        # the archive is read as column rows, so select every field rather than the entity
+        fields = fields or tuple(schemas.TaskOut.__fields__)
+    if stream:
+        query = task_repo.tasks_for_user_query(current_user.id, project_id=project_id, status=status)
+        return stream_ndjson(db, query, models.Task, schemas.TaskOut, cursor, fields)
+
+    async def load():
+        tasks, next_cursor = await task_repo.list_tasks_for_user(
+            db, current_user.id, project_id=project_id, status=status, limit=limit, cursor=cursor,
+            columns=select_columns(models.Task, schemas.TaskOut, fields), include_archived=include_archived,
+        )
+        if not tasks and cursor is None:
+            raise HTTPException(status_code=404, detail="No tasks found for the given criteria")
+        return tasks, next_cursor
 
-    # apply filters
     if project_id:
-        query = query.filter(models.Task.project_id == project_id)
-    if status:
-        query = query.filter(models.Task.status == status)
-
-    #filter for tasks user has access to
-    tasks = query.join(models.Project)\
-        .join(models.Team)\
-        .join(models.TeamMembership)\
-        .filter(models.TeamMembership.user_id == current_user.id)\
-        .all()
-    
-    if not tasks:
-        raise HTTPException(status_code=404, detail="No tasks found for the given criteria")
-    
-    return tasks
+        # only project lists are cached, every task write names the project to invalidate
+        key = cache_key("tasks", current_user.id, project_id, status, limit, cursor, fields, include_archived)
+        tags = [project_tag(project_id), user_tag(current_user.id)]
+        return await cached_page(key, tags, models.Task, schemas.TaskOut, load, if_none_match, fields)
+
+    tasks, next_cursor = await load()
+    # the same rows answer every field selection, so the ETag is shared too
+    etag = collection_etag(tasks, next_cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(render_page(models.Task, schemas.TaskOut, tasks, next_cursor, fields), etag)
+
+async def _get_tasks_by_ids(task_ids, fields, if_none_match, db, loaders, current_user):
+    # the batch version of GET /tasks/{id}: one page, in the order asked for, leaving out
+    # ids that do not exist or are not visible to the user
+    columns = select_columns(models.Task, schemas.TaskOut, fields)
+    if columns and "project_id" not in {column.key for column in columns}:
+        # needed for the access check, rendering only picks the selected fields
+        columns.append(models.Task.project_id)
+    tasks = await task_repo.get_tasks_by_ids(db, task_ids, columns)
+    roles = await loaders.team_roles(current_user.id, {task.project_id for task in tasks})
+    visible = {task.id: task for task in tasks if roles[task.project_id] is not None}
+    tasks = [visible[task_id] for task_id in task_ids if task_id in visible]
+
+    etag = collection_etag(tasks)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(render_page(models.Task, schemas.TaskOut, tasks, None, fields), etag)
 
 @router.post("/", response_model=schemas.TaskOut, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task: schemas.TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    project = db.query(models.Project).filter(models.Task.project_id == task.project_id).first()
+    project = await project_repo.get_project(db, task.project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    team_member = db.query(models.TeamMembership).filter(
-        models.TeamMembership.team_id == project.team_id,
-        models.TeamMembership.user_id == current_user.id
-    ).first()
+    role = await team_repo.get_member_role(db, project.team_id, current_user.id)
 
-    if not team_member:
+    if not role:
         raise HTTPException(status_code=403, detail="Not authorized to create task for this project")
-    if team_member.role not in ["admin", "member"]:
+    if role not in ["admin", "member"]:
         raise HTTPException(status_code=403, detail="Not authorized to create task for this project")
     
-    new_task = models.Task(**task.dict(), created_by=current_user.id)
-    db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    new_task = await task_repo.create_task(db, task.dict(), created_by=current_user.id)
+    await response_cache.invalidate(project_tag(new_task.project_id))
+    _publish("task.created", new_task)
+    await activity_log.record("task.created", current_user.id, new_task.project_id, task_id=new_task.id, title=new_task.title)
     return new_task
 
+def _bulk_failure(index: int, error: str, task_id: Optional[int] = None) -> schemas.TaskBulkResult:
+    return schemas.TaskBulkResult(index=index, id=task_id, ok=False, error=error)
+
+# bulk routes must be registered before /{task_id} so "bulk" is not read as an id
+@router.post("/bulk", response_model=schemas.TaskBulkResponse)
+async def bulk_create_tasks(
+    payload: schemas.TaskBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    team_ids = await project_repo.get_team_ids(db, {task.project_id for task in payload.tasks})
+    allowed_projects = set()
+    for project_id, team_id in team_ids.items():
+        if await team_repo.get_member_role(db, team_id, current_user.id) in ["admin", "member"]:
+            allowed_projects.add(project_id)
+
+    results = [None] * len(payload.tasks)
+    pending = []
+    for index, task in enumerate(payload.tasks):
+        if task.project_id not in team_ids:
+            results[index] = _bulk_failure(index, "Project not found")
+        elif task.project_id not in allowed_projects:
+            results[index] = _bulk_failure(index, "Not authorized to create task for this project")
+        else:
+            pending.append(index)
+
+    created = await task_repo.bulk_create_tasks(
+        db, [payload.tasks[index].dict() for index in pending], created_by=current_user.id
+    )
+    await response_cache.invalidate(*{project_tag(new_task.project_id) for new_task in created})
+    for index, new_task in zip(pending, created):
+        _publish("task.created", new_task)
+        await activity_log.record("task.created", current_user.id, new_task.project_id, task_id=new_task.id, title=new_task.title)
+        results[index] = schemas.TaskBulkResult(
+            index=index, id=new_task.id, ok=True, task=schemas.TaskOut.from_orm(new_task)
+        )
+    return {"results": results}
+
+@router.patch("/bulk", response_model=schemas.TaskBulkResponse)
+async def bulk_update_tasks(
+    payload: schemas.TaskBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    tasks = {task.id: task for task in await task_repo.get_tasks_by_ids(db, [item.id for item in payload.tasks])}
+    # the update refreshes these objects in place
+    before = {task.id: (task.status, task.assigned_to) for task in tasks.values()}
+    # the versions the authorization checks below saw; tasks changed since are not updated
+    versions = {task.id: task.version for task in tasks.values()}
+
+    results = [None] * len(payload.tasks)
+    pending = []
+    changes = {}
+    for index, item in enumerate(payload.tasks):
+        task = tasks.get(item.id)
+        if not task:
+            results[index] = _bulk_failure(index, "Task not found", item.id)
+        elif current_user.id not in [task.created_by, task.assigned_to]:
+            results[index] = _bulk_failure(index, "Not authorized to update this task", item.id)
+        else:
+            values = item.dict(exclude_unset=True, exclude={"id"})
+            changes.setdefault(tuple(sorted(values.items())), []).append(item.id)
+            pending.append(index)
+
+    updated = await task_repo.bulk_update_tasks(
+        db, [(dict(values), ids) for values, ids in changes.items()], versions
+    )
+    await response_cache.invalidate(*{project_tag(task.project_id) for task in updated.values()})
+    for index in pending:
+        task = updated.get(payload.tasks[index].id)
+        if task is None:
+            results[index] = _bulk_failure(index, "Task was modified concurrently, retry", payload.tasks[index].id)
+            continue
+        _publish("task.updated", task)
+        await _record_changes(current_user.id, task, *before[task.id])
+        results[index] = schemas.TaskBulkResult(index=index, id=task.id, ok=True, task=schemas.TaskOut.from_orm(task))
+    return {"results": results}
+
+@router.delete("/bulk", response_model=schemas.TaskBulkResponse)
+async def bulk_delete_tasks(
+    payload: schemas.TaskBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    tasks = {task.id: task for task in await task_repo.get_tasks_by_ids(db, payload.ids)}
+
+    results = []
+    deletable = []
+    deleted_projects = {}
+    for index, task_id in enumerate(payload.ids):
+        task = tasks.get(task_id)
+        if not task:
+            results.append(_bulk_failure(index, "Task not found", task_id))
+        elif current_user.id != task.created_by:
+            results.append(_bulk_failure(index, "Not authorized to delete this task", task_id))
+        else:
+            deletable.append(task_id)
+            deleted_projects[task_id] = task.project_id
+            results.append(schemas.TaskBulkResult(index=index, id=task_id, ok=True))
+
+    await task_repo.bulk_delete_tasks(db, deletable)
+    await response_cache.invalidate(
+        *{project_tag(project_id) for project_id in deleted_projects.values()},
+        *(task_tag(task_id) for task_id in deletable),
+    )
+    for task_id, project_id in deleted_projects.items():
+        due_scheduler.task_deleted(task_id)
+        publish_change("task.deleted", project_id, task_id, {"id": task_id, "project_id": project_id})
+        await activity_log.record("task.deleted", current_user.id, project_id, task_id=task_id, title=tasks[task_id].title)
+    return {"results": results}
+
 @router.get("/{task_id}", response_model=schemas.TaskOut)
 async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated TaskOut fields to return"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    fields = parse_fields(schemas.TaskOut, fields)
+    columns = select_columns(models.Task, schemas.TaskOut, fields) if fields else None
+    task, team_id = await task_repo.get_task_with_team_id(db, task_id, columns)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    team_member = db.query(models.TeamMembership).filter(
-        models.TeamMembership.team_id == task.project_id.team_id,
-        models.TeamMembership.user_id == current_user.id
-    ).first()
-
-    if not team_member:
+    if not await team_repo.get_member_role(db, team_id, current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized to access this task")
 
+    etag = row_etag(task)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if fields:
+        return json_response(render_item(models.Task, schemas.TaskOut, task, fields), etag)
+    response.headers["ETag"] = etag
     return task
 
 @router.patch("/{task_id}", response_model=schemas.TaskOut)
 async def update_task(
     task_id: int,
     update_data: schemas.TaskUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    task = await task_repo.get_task(db, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
     if current_user.id not in [task.created_by, task.assigned_to]:
         raise HTTPException(status_code=403, detail="Not authorized to update this task")
-    
-    for key, value in update_data.dict(exclude_unset=True).items():
-        setattr(task, key, value)
-    db.commit()
-    db.refresh(task)
+
+    check_if_match(if_match, row_etag(task))
+    old_status, old_assignee = task.status, task.assigned_to
+    with versioned_write(if_match):
+        task = await task_repo.update_task(db, task, update_data.dict(exclude_unset=True))
+    await response_cache.invalidate(project_tag(task.project_id))
+    _publish("task.updated", task)
+    await _record_changes(current_user.id, task, old_status, old_assignee)
+    response.headers["ETag"] = row_etag(task)
     return task
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
         task_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    task = await task_repo.get_task_for_delete(db, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
     if current_user.id != task.created_by:
         raise HTTPException(status_code=403, detail="Not authorized to delete this task")
     
-    db.delete(task)
-    db.commit()
-    return {"detail": "Task deleted successfully"}
\ No newline at end of file
+    await task_repo.delete_task(db, task)
+    await response_cache.invalidate(project_tag(task.project_id), task_tag(task.id))
+    due_scheduler.task_deleted(task.id)
+    publish_change("task.deleted", task.project_id, task.id, {"id": task.id, "project_id": task.project_id})
+    await activity_log.record("task.deleted", current_user.id, task.project_id, task_id=task.id, title=task.title)
+    return {"detail": "Task deleted successfully"}
@@ -1,104 +1,143 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from app import models, schemas
 from app.models import User
 from app.database import get_db
+from app.core.activity import activity_log
+from app.core.etag import check_if_match, collection_etag, etag_matches, not_modified, row_etag, versioned_write
+from app.core.pagination import DEFAULT_LIMIT, MAX_LIMIT, stream_ndjson
+from app.core.config import settings
+from app.core.jobs import job_accepted, jobs
+from app.core.response_cache import deleted_tree_tags, response_cache, task_tag, team_tag, user_tag
 from app.core.security import get_current_user
+from app.repositories import deletion as deletion_repo, team as team_repo
 
 router = APIRouter(
     prefix="/teams",
     tags=["teams"]
 )
 
-@router.get("/", response_model=List[schemas.TeamOut])
+@router.get("/", response_model=schemas.Page[schemas.TeamOut])
 async def get_teams(
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    teams = db.query(models.Team).all()
-    return teams
+    if stream:
+        return stream_ndjson(db, team_repo.teams_query(), models.Team, schemas.TeamOut, cursor)
+
+    teams, next_cursor = await team_repo.list_teams(db, limit=limit, cursor=cursor)
+    etag = collection_etag(teams, next_cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return {"items": teams, "next_cursor": next_cursor}
 
 @router.post("/", response_model=schemas.TeamOut, status_code=status.HTTP_201_CREATED)
 async def create_team(
     team: schemas.TeamCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    new_team = models.Team(
-        name=team.name,
-        created_by=current_user.id
-    )
-    db.add(new_team)
-    db.commit()
-    db.refresh(new_team)
-    return new_team
+    return await team_repo.create_team(db, name=team.name, created_by=current_user.id)
 
 @router.get("/{team_id}", response_model=schemas.TeamOut)
 async def get_team(
     team_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    team = await team_repo.get_team(db, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
+    etag = row_etag(team)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return team
 
 @router.put("/{team_id}", response_model=schemas.TeamOut)
 async def update_team(
     team_id: int,
     team_data: schemas.TeamUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    team = db.query(models.Team.filter(team_id == models.Team.id)).first()
+    team = await team_repo.get_team(db, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
     if team.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this team")
-    
-    for key, value in team_data.dict(exclude_unset=True).items():
-        setattr(team, key, value)
-    db.commit()
-    db.refresh(team)
+
+    check_if_match(if_match, row_etag(team))
+    with versioned_write(if_match):
+        team = await team_repo.update_team(db, team, team_data.dict(exclude_unset=True, exclude={"members"}))
+    response.headers["ETag"] = row_etag(team)
     return team
 
-@router.delete("/{team_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{team_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.JobOut}},
+)
 async def delete_team(
     team_id: int,
-    db: Session = Depends(get_db),
+    background: bool = False,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    team = await team_repo.get_team(db, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     if team.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this team")
-    db.delete(team)
-    db.commit()
+
+    # the team's projects, with their tasks and comments, go with it
+    projects = deletion_repo.project_ids_query(team_id=team.id)
+    total = await deletion_repo.count_tasks(db, projects)
+    if background or total > settings.DELETE_BACKGROUND_THRESHOLD:
+        async def work(job):
+            async def on_chunk(task_ids):
+                job.advance(len(task_ids))
+                await response_cache.invalidate(team_tag(team_id), *map(task_tag, task_ids))
+
+            tree = await deletion_repo.delete_tree_in_chunks(
+                projects, team_id, chunk_size=settings.DELETE_CHUNK_SIZE, on_chunk=on_chunk
+            )
+            job.advance(len(tree.task_ids))
+            await response_cache.invalidate(team_tag(team_id), *deleted_tree_tags(tree))
+
+        return job_accepted(jobs.start("team.delete", team.id, current_user.id, total, work))
+
+    tree = await deletion_repo.delete_team(db, team.id)
+    await response_cache.invalidate(team_tag(team.id), *deleted_tree_tags(tree))
     return {"detail": "Team deleted successfully"}
 
-@router.post("/{team_id}/members", response_model=schemas.TeamMemberOut)
+@router.post("/{team_id}/members", response_model=schemas.TeamMemberShipOut)
 async def add_team_member(
     team_id: int,
-    member: schemas.TeamMemberCreate, 
-    db: Session = Depends(get_db),
+    member: schemas.TeamMemberShipCreate, 
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
+    team = await team_repo.get_team(db, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")   
     
     if team.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to add members to this team")
     
-    new_membership = models.TeamMemberShip(
-        team_id = team.id,
-        user_id = member.user_id
-    )
-    db.add(new_membership)
-    db.commit()
-    db.refresh(new_membership)
-    return new_membership
\ No newline at end of file
+    membership = await team_repo.add_member(db, team_id=team.id, user_id=member.user_id, role=member.role)
+    await response_cache.invalidate(user_tag(member.user_id))
+    await activity_log.record("team.member_added", current_user.id, team_id=team.id, user_id=member.user_id, role=member.role)
+    return membership
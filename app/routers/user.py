@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas
+from app.models import User
+from app.database import get_db
+from app.core.loader import Loaders, get_loaders
+from app.core.pagination import MAX_LIMIT, parse_ids
+from app.core.security import get_current_user
+from app.repositories import user as user_repo
+
+router = APIRouter(
+    prefix="/users",
+    tags=["users"]
+)
+
+@router.get("/", response_model=schemas.Page[schemas.UserOut])
+async def get_users(
+    ids: str = Query(..., description=f"Comma-separated ids of up to {MAX_LIMIT} users to fetch at once"),
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
+    current_user: User = Depends(get_current_user)
+):
+    user_ids = parse_ids(ids)
+    # users are visible to themselves and to the members of their teams; the rest are left out
+    visible = set(await user_repo.get_visible_user_ids(db, current_user.id, user_ids))
+    users = await loaders.users.load_many(user_id for user_id in user_ids if user_id in visible)
+    return {"items": [user for user in users.values() if user is not None], "next_cursor": None}
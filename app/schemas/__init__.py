@@ -0,0 +1,16 @@
+from app.schemas.user import UserCreate, UserLogin, UserUpdate, UserOut
+from app.schemas.team import (
+    TeamCreate, TeamUpdate, TeamOut,
+    TeamMemberShipCreate, TeamMemberShipUpdate, TeamMemberShipOut,
+)
+from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectOut, ProjectSummary, AssigneeSummary
+from app.schemas.task import (
+    TaskCreate, TaskUpdate, TaskOut, TaskStatus, TaskPriority,
+    TaskBulkCreate, TaskBulkUpdate, TaskBulkUpdateItem, TaskBulkDelete, TaskBulkResult, TaskBulkResponse,
+    CommentImport, TaskImport, ImportLineError, ImportResult,
+)
+from app.schemas.comment import CommentCreate, CommentUpdate, CommentOut
+from app.schemas.search import SearchHit
+from app.schemas.job import JobOut
+from app.schemas.pagination import Page
+from app.schemas.activity import ActivityOut
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class ActivityOut(BaseModel):
+    id: int
+    project_id: int
+    actor_id: int
+    type: str
+    task_id: Optional[int]
+    data: Dict[str, Any]
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -4,7 +4,7 @@ from datetime import datetime
 
 
 class CommentBase(BaseModel):
-    content: constr = constr(min_length=1, max_length=500)
+    content: constr(min_length=1, max_length=500)
     task_id: int
 
 class CommentCreate(CommentBase):
@@ -20,4 +20,4 @@ class CommentOut(CommentBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        orm_mode = True
\ No newline at end of file
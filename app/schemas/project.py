@@ -1,9 +1,11 @@
 from pydantic import BaseModel, constr
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
+from app.schemas.task import TaskStatus
+
 class ProjectBase(BaseModel):
-    name: constr = constr(min_length=1, max_length=100)
+    name: constr(min_length=1, max_length=100)
     description: Optional[str] = None
 
 class ProjectCreate(ProjectBase):
@@ -22,4 +24,17 @@ class ProjectOut(ProjectBase):
     updated_at: Optional[datetime]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        orm_mode = True
+
+class AssigneeSummary(BaseModel):
+    assigned_to: Optional[int]
+    total: int
+    overdue: int
+    by_status: Dict[TaskStatus, int]
+
+class ProjectSummary(BaseModel):
+    project_id: int
+    total: int
+    overdue: int
+    by_status: Dict[TaskStatus, int]
+    by_assignee: List[AssigneeSummary]
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    kind: str
+    id: int
+    task_id: int
+    project_id: int
+    text: str
+    rank: float
+
+    class Config:
+        orm_mode = True
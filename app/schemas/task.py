@@ -1,4 +1,4 @@
-from pydantic import BaseModel, constr
+from pydantic import BaseModel, conlist, constr
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -16,10 +16,11 @@ class TaskStatus(str, Enum):
     
 
 class TaskBase(BaseModel):
-    title: constr = constr(min_length=1, max_length=100)
+    title: constr(min_length=1, max_length=100)
     description: Optional[str] = None
     priority: Optional[TaskPriority] = TaskPriority.MEDIUM
     status: Optional[TaskStatus] = TaskStatus.TO_DO
+    due_date: Optional[datetime] = None
 
 class TaskCreate(TaskBase):
     project_id: int
@@ -29,7 +30,8 @@ class TaskUpdate(BaseModel):
     description: Optional[str] = None
     priority: Optional[TaskPriority] = None 
     status: Optional[TaskStatus] = None
-    assigned_to: Optional[str] = None
+    assigned_to: Optional[int] = None
+    due_date: Optional[datetime] = None
 
 class TaskOut(TaskBase):
     id: int
@@ -38,6 +40,53 @@ class TaskOut(TaskBase):
     assigned_to: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime]
+    # set by the due-date scheduler when the due date passes before the task is done
+    overdue: bool = False
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        orm_mode = True
+
+
+MAX_BULK_TASKS = 500
+
+class TaskBulkCreate(BaseModel):
+    tasks: conlist(TaskCreate, min_items=1, max_items=MAX_BULK_TASKS)
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+class TaskBulkUpdate(BaseModel):
+    tasks: conlist(TaskBulkUpdateItem, min_items=1, max_items=MAX_BULK_TASKS)
+
+class TaskBulkDelete(BaseModel):
+    ids: conlist(int, min_items=1, max_items=MAX_BULK_TASKS)
+
+class TaskBulkResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    task: Optional[TaskOut] = None
+    error: Optional[str] = None
+
+class TaskBulkResponse(BaseModel):
+    results: List[TaskBulkResult]
+
+
+# project import (see app/core/transfer.py for the line formats)
+class CommentImport(BaseModel):
+    content: constr(min_length=1, max_length=500)
+
+class TaskImport(TaskBase):
+    assigned_to: Optional[int] = None
+    comments: List[CommentImport] = []
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+class ImportResult(BaseModel):
+    tasks: int
+    comments: int
+    # lines rejected; `errors` lists the first MAX_IMPORT_ERRORS of them
+    failed: int
+    errors: List[ImportLineError]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, constr
+from pydantic import BaseModel
 from typing import List, Optional
 
 class TeamMemberShipBase(BaseModel):
@@ -14,7 +14,7 @@ class TeamMemberShipUpdate(BaseModel):
     team_id: Optional[int] = None    
 
 class TeamMemberShipOut(TeamMemberShipBase):
-    id: int
+    user_id: int
     team_id: int
     
     class Config:
@@ -1,24 +1,28 @@
 from pydantic import BaseModel, EmailStr, constr
 from typing import Optional
-from datetime import date
+from datetime import datetime
 
 
 class UserBase(BaseModel):
-    username: constr = constr(min_length=3, max_length=50)
+    username: constr(min_length=3, max_length=50)
     email: EmailStr
 
-class UserCreate(BaseModel):
-    password: constr = constr(min_length=8)  
+class UserCreate(UserBase):
+    password: constr(min_length=8)
+
+class UserLogin(BaseModel):
+    username: str
+    password: str
 
 class UserUpdate(BaseModel):
-    username = Optional[str] = None
+    username: Optional[str] = None
     email: Optional[EmailStr] = None
-    password: Optional[constr] = None
+    password: Optional[constr(min_length=8)] = None
 
-class UserOut(BaseModel):
+class UserOut(UserBase):
     id: int
-    created_at: str
+    created_at: datetime
     is_active: bool = True
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        orm_mode = True
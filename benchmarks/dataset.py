@@ -0,0 +1,140 @@
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy import insert
+
+from app.core.security import hash_password
+from app.database import SessionLocal
+from app.models import Comment, Project, Task, TaskPriority, TaskStatus, Team, TeamMembership, User
+from app.repositories import summary as summary_repo
+
+PASSWORD = "benchmark-password"
+
+# per user: teams, projects per team, tasks per project, comments per task (all on average)
+TEAMS_PER_USER = 0.1
+PROJECTS_PER_TEAM = 4
+TASKS_PER_PROJECT = 40
+COMMENTS_PER_TASK = 2
+
+STATUS_WEIGHTS = {TaskStatus.TO_DO: 3, TaskStatus.IN_PROGRESS: 2, TaskStatus.DONE: 5}
+PRIORITY_WEIGHTS = {TaskPriority.LOW: 3, TaskPriority.MEDIUM: 5, TaskPriority.HIGH: 2}
+INSERT_CHUNK = 5000
+
+
+def zipf_weights(n: int, s: float = 1.1) -> List[float]:
+    # a few hot teams/projects/tasks get most of the rows and traffic, like real usage
+    return [1 / (rank + 1) ** s for rank in range(n)]
+
+
+@dataclass
+class Dataset:
+    seed: int
+    user_ids: List[int] = field(default_factory=list)
+    team_members: Dict[int, List[int]] = field(default_factory=dict)
+    user_teams: Dict[int, List[int]] = field(default_factory=dict)
+    team_projects: Dict[int, List[int]] = field(default_factory=dict)
+    project_tasks: Dict[int, List[int]] = field(default_factory=dict)
+
+    @property
+    def task_ids(self) -> List[int]:
+        return [task_id for ids in self.project_tasks.values() for task_id in ids]
+
+    def user_projects(self, user_id: int) -> List[int]:
+        return [project_id for team_id in self.user_teams.get(user_id, []) for project_id in self.team_projects[team_id]]
+
+
+async def _insert(db, model, rows: List[dict]) -> List[int]:
+    ids = []
+    for start in range(0, len(rows), INSERT_CHUNK):
+        result = await db.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows[start:start + INSERT_CHUNK]
+        )
+        ids.extend(result.all())
+    return ids
+
+async def generate(users: int, seed: int = 0) -> Dataset:
+    """Insert a deterministic dataset for `users` users into an empty schema.
+
+    Team size, projects per team, tasks per project and comments per task all
+    follow a Zipf distribution, so a handful of teams and projects are hot.
+    """
+    rng = random.Random(seed)
+    data = Dataset(seed=seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    start = now - timedelta(days=180)
+    password = hash_password(PASSWORD)
+
+    def created_at(index: int) -> datetime:
+        # strictly increasing timestamps keep keyset pages deterministic
+        return start + timedelta(seconds=index)
+
+    n_teams = max(1, int(users * TEAMS_PER_USER))
+    async with SessionLocal() as db:
+        data.user_ids = await _insert(db, User, [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "password": password}
+            for i in range(users)
+        ])
+        team_ids = await _insert(db, Team, [
+            {"name": f"team{i}", "created_by": data.user_ids[i % users], "created_at": created_at(i)}
+            for i in range(n_teams)
+        ])
+
+        # every user joins 1-3 teams, picked by popularity; the team creator is always an admin
+        team_weights = zipf_weights(n_teams)
+        for i, team_id in enumerate(team_ids):
+            data.team_members[team_id] = [data.user_ids[i % users]]
+        for user_id in data.user_ids:
+            for team_id in rng.choices(team_ids, team_weights, k=rng.choice((1, 1, 2, 3))):
+                if user_id not in data.team_members[team_id]:
+                    data.team_members[team_id].append(user_id)
+        memberships = []
+        for team_id, members in data.team_members.items():
+            for position, user_id in enumerate(members):
+                data.user_teams.setdefault(user_id, []).append(team_id)
+                memberships.append({"team_id": team_id, "user_id": user_id, "role": "admin" if position == 0 else "member"})
+        await db.execute(insert(TeamMembership), memberships)
+
+        project_teams = rng.choices(team_ids, team_weights, k=n_teams * PROJECTS_PER_TEAM)
+        project_ids = await _insert(db, Project, [
+            {"name": f"project{i}", "team_id": team_id, "owner_id": data.team_members[team_id][0],
+             "created_at": created_at(i)}
+            for i, team_id in enumerate(project_teams)
+        ])
+        for project_id, team_id in zip(project_ids, project_teams):
+            data.team_projects.setdefault(team_id, []).append(project_id)
+        for team_id in team_ids:
+            data.team_projects.setdefault(team_id, [])
+
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+        priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+        task_projects = rng.choices(project_ids, zipf_weights(len(project_ids)), k=len(project_ids) * TASKS_PER_PROJECT)
+        team_of = dict(zip(project_ids, project_teams))
+        task_rows = []
+        for i, project_id in enumerate(task_projects):
+            members = data.team_members[team_of[project_id]]
+            task_rows.append({
+                "title": f"task {i}",
+                "description": f"synthetic task {i} in project {project_id}",
+                "project_id": project_id,
+                "created_by": rng.choice(members),
+                "assigned_to": rng.choice(members) if rng.random() < 0.8 else None,
+                "status": rng.choices(statuses, status_weights)[0],
+                "priority": rng.choices(priorities, priority_weights)[0],
+                "due_date": now + timedelta(days=rng.randint(-30, 60)) if rng.random() < 0.6 else None,
+                "created_at": created_at(i),
+            })
+        task_ids = await _insert(db, Task, task_rows)
+        for task_id, project_id in zip(task_ids, task_projects):
+            data.project_tasks.setdefault(project_id, []).append(task_id)
+
+        comment_tasks = rng.choices(task_ids, zipf_weights(len(task_ids)), k=len(task_ids) * COMMENTS_PER_TASK)
+        await _insert(db, Comment, [
+            {"task_id": task_id, "user_id": rng.choice(data.user_ids), "content": f"comment {i}",
+             "created_at": created_at(i)}
+            for i, task_id in enumerate(comment_tasks)
+        ])
+        await db.commit()
+        await summary_repo.rebuild(db)
+    return data
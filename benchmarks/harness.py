@@ -0,0 +1,34 @@
+import os
+
+# benchmarks drop and recreate every table, so they never use the app's DATABASE_URL;
+# point BENCH_DATABASE_URL at a scratch Postgres database to benchmark against Postgres
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", "sqlite+aiosqlite:///./benchmark.db")
+# the seeded data is only on that database, so every read goes there too
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+# login would otherwise be all bcrypt; set BCRYPT_ROUNDS to measure the production cost
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from fastapi import FastAPI
+
+from app.core.cache import membership_cache, user_cache
+from app.core.response_cache import response_cache
+from app.database import Base, get_engine
+from app.routers import auth, comment, project, task, team, user
+
+
+def build_app() -> FastAPI:
+    api = FastAPI()
+    for module in (auth, team, project, task, comment, user):
+        api.include_router(module.router)
+    return api
+
+async def reset_schema() -> None:
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+async def clear_caches() -> None:
+    user_cache.clear()
+    membership_cache.clear()
+    await response_cache.clear()
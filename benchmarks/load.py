@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.harness import build_app, clear_caches, reset_schema
+
+import httpx
+
+from app.core.activity import activity_log
+from app.core.instrumentation import count_statements
+from app.core.security import create_access_token
+from app.database import dispose_engines, get_engine
+from benchmarks.dataset import PASSWORD, Dataset, generate, zipf_weights
+
+# Seeds a synthetic dataset and drives each scenario through the app in-process:
+#   python -m benchmarks.load --users 1000 --requests 500 --concurrency 8
+#   python -m benchmarks.load --save benchmarks/baseline.json   # record a new baseline
+# Exits non-zero when a scenario regresses against the baseline.
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+Request = Tuple[str, str, dict]
+
+
+@dataclass
+class Scenario:
+    name: str
+    # returns (method, url, json body) for a random user of the dataset
+    build: Callable[[Dataset, random.Random, int], Request]
+
+
+def _project(data: Dataset, rng: random.Random, user_id: int) -> int:
+    projects = data.user_projects(user_id)
+    return rng.choices(projects, zipf_weights(len(projects)))[0]
+
+def _login(data, rng, user_id):
+    return "POST", "/auth/login", {"username": f"user{data.user_ids.index(user_id)}", "password": PASSWORD}
+
+def _tasks_by_project(data, rng, user_id):
+    return "GET", f"/tasks/?project_id={_project(data, rng, user_id)}", None
+
+def _tasks_by_project_status(data, rng, user_id):
+    status = rng.choice(("to_do", "in_progress", "done"))
+    return "GET", f"/tasks/?project_id={_project(data, rng, user_id)}&status={status}", None
+
+def _tasks_all(data, rng, user_id):
+    return "GET", "/tasks/", None
+
+def _create_task(data, rng, user_id):
+    return "POST", "/tasks/", {"title": "benchmark task", "project_id": _project(data, rng, user_id)}
+
+def _comments(data, rng, user_id):
+    tasks = data.project_tasks.get(_project(data, rng, user_id)) or data.task_ids
+    return "GET", f"/comments/?task_id={rng.choice(tasks)}", None
+
+def _projects(data, rng, user_id):
+    return "GET", "/projects/", None
+
+
+SCENARIOS = [
+    Scenario("login", _login),
+    Scenario("tasks_by_project", _tasks_by_project),
+    Scenario("tasks_by_project_status", _tasks_by_project_status),
+    Scenario("tasks_all", _tasks_all),
+    Scenario("create_task", _create_task),
+    Scenario("list_comments", _comments),
+    Scenario("list_projects", _projects),
+]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+async def run_scenario(client: httpx.AsyncClient, data: Dataset, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    rng = random.Random(f"{data.seed}:{scenario.name}")
+    # active users follow the same skew as team sizes
+    users = [user_id for user_id in data.user_ids if data.user_projects(user_id)]
+    weights = zipf_weights(len(users))
+    plan = [(user_id, scenario.build(data, rng, user_id)) for user_id in rng.choices(users, weights, k=requests)]
+    tokens = {user_id: create_access_token({"sub": str(user_id)}) for user_id, _ in plan}
+
+    latencies: List[float] = []
+    statements: List[int] = []
+    errors = 0
+    queue = iter(plan)
+
+    async def worker():
+        nonlocal errors
+        for user_id, (method, url, body) in queue:
+            headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+            with count_statements() as counter:
+                started = time.perf_counter()
+                response = await client.request(method, url, json=body, headers=headers)
+                latencies.append((time.perf_counter() - started) * 1000)
+            statements.append(counter.count)
+            # an empty project legitimately answers 404
+            if response.status_code >= 400 and response.status_code != 404:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "statements_per_request": statistics.mean(statements),
+    }
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        # statements per request only vary with concurrent cache misses; latency gets more slack
+        if result["statements_per_request"] > expected["statements_per_request"] + 0.1:
+            regressions.append(f"{name}: statements/request {expected['statements_per_request']:.2f} -> {result['statements_per_request']:.2f}")
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {expected['p95_ms']:.1f}ms -> {result['p95_ms']:.1f}ms")
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} failed requests")
+    return regressions
+
+async def run(args) -> int:
+    scenarios = [scenario for scenario in SCENARIOS if not args.scenario or scenario.name in args.scenario]
+    await reset_schema()
+    started = time.perf_counter()
+    data = await generate(args.users, seed=args.seed)
+    print(f"seeded {args.users} users, {len(data.task_ids)} tasks in {time.perf_counter() - started:.1f}s "
+          f"({get_engine().url.get_backend_name()})")
+
+    results = {}
+    transport = httpx.ASGITransport(app=build_app())
+    # writes pay for the activity log as they do in the app, flushes included
+    activity_log.start()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in scenarios:
+            await clear_caches()
+            results[scenario.name] = await run_scenario(client, data, scenario, args.requests, args.concurrency)
+    await activity_log.stop()
+    await dispose_engines()
+
+    print(f"{'scenario':26}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'stmts':>7}{'errors':>8}")
+    for name, result in results.items():
+        print(f"{name:26}{result['throughput']:>9.1f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+              f"{result['p99_ms']:>9.2f}{result['statements_per_request']:>7.2f}{result['errors']:>8}")
+
+    config = {"users": args.users, "seed": args.seed, "requests": args.requests, "concurrency": args.concurrency}
+    if args.save:
+        Path(args.save).write_text(json.dumps({"config": config, "results": results}, indent=2) + "\n")
+        print(f"saved {args.save}")
+        return 0
+
+    if not args.baseline.exists():
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["config"] != config:
+        print(f"baseline was recorded with {baseline['config']}, not comparing")
+        return 0
+    regressions = compare(results, baseline["results"], args.tolerance)
+    for regression in regressions:
+        print("REGRESSION", regression)
+    return 1 if regressions else 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load and latency benchmark against a synthetic dataset")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenario", action="append", help="run only these scenarios (repeatable)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown vs the baseline")
+    parser.add_argument("--save", help="write the results as a new baseline to this path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
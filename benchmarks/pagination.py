@@ -0,0 +1,83 @@
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.harness import build_app, clear_caches, reset_schema
+
+import httpx
+from sqlalchemy import insert
+
+from app.core.security import create_access_token, hash_password
+from app.database import SessionLocal, dispose_engines
+from app.models import Comment, Project, Task, Team, TeamMembership, User
+
+# Creates rows that share a created_at second, pages through every list endpoint
+# with a small limit and fails if a page skips or repeats a row:
+#   python -m benchmarks.pagination
+
+ROWS = 5
+LIMIT = 2
+
+
+async def seed() -> None:
+    await reset_schema()
+
+    # a whole second with no fraction, the way the database default stores it
+    second = datetime.now(timezone.utc).replace(microsecond=0)
+    async with SessionLocal() as db:
+        await db.execute(insert(User), [{"username": "user0", "email": "user0@example.com", "password": hash_password("password")}])
+        await db.execute(insert(Team), [{"name": f"team{i}", "created_by": 1, "created_at": second} for i in range(ROWS)])
+        await db.execute(insert(TeamMembership), [{"team_id": i + 1, "user_id": 1, "role": "admin"} for i in range(ROWS)])
+        await db.execute(insert(Project), [
+            {"name": f"project{i}", "owner_id": 1, "team_id": 1, "created_at": second} for i in range(ROWS)
+        ])
+        await db.execute(insert(Task), [
+            {"title": f"task{i}", "project_id": 1, "created_by": 1, "created_at": second} for i in range(ROWS)
+        ])
+        await db.execute(insert(Comment), [
+            {"task_id": 1, "user_id": 1, "content": f"comment{i}", "created_at": second} for i in range(ROWS)
+        ])
+        await db.commit()
+
+async def collect(client: httpx.AsyncClient, url: str, headers: dict) -> list:
+    ids, cursor = [], None
+    while True:
+        params = {"limit": LIMIT, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(httpx.URL(url).copy_merge_params(params), headers=headers)
+        if response.status_code >= 400:
+            raise RuntimeError(f"GET {url} -> {response.status_code} {response.text}")
+        page = response.json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+async def run() -> bool:
+    await seed()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    transport = httpx.ASGITransport(app=build_app())
+    ok = True
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # the API's own inserts (database/model defaults) land in the same second as well
+        for i in range(ROWS):
+            response = await client.post("/tasks/", json={"title": f"api task{i}", "project_id": 2}, headers=headers)
+            if response.status_code >= 400:
+                raise RuntimeError(f"POST /tasks/ -> {response.status_code} {response.text}")
+        for url, expected in (
+            ("/teams/", list(range(1, ROWS + 1))),
+            ("/projects/", list(range(1, ROWS + 1))),
+            ("/tasks/?project_id=1", list(range(1, ROWS + 1))),
+            ("/tasks/?project_id=2", list(range(ROWS + 1, 2 * ROWS + 1))),
+            ("/comments/?task_id=1", list(range(1, ROWS + 1))),
+        ):
+            await clear_caches()
+            ids = await collect(client, url, headers)
+            passed = ids == expected
+            ok = ok and passed
+            print(f"{url:30} {ids}" + ("" if passed else f"  expected {expected}"))
+    await dispose_engines()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run()) else 1)
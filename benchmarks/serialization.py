@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks.harness import reset_schema
+
+from sqlalchemy import select
+
+from app import models, schemas
+from app.core import serialization
+from app.core.config import settings
+from app.database import SessionLocal, dispose_engines
+from benchmarks.dataset import generate
+
+# Compares the per-row cost of the two list serialization paths on a seeded dataset:
+#   python -m benchmarks.serialization --users 500
+# "orm" loads entities and validates them into the Out schema (the default path),
+# "fast" selects plain columns and encodes them with orjson (FAST_SERIALIZATION).
+
+CASES = [
+    (models.Task, schemas.TaskOut),
+    (models.Comment, schemas.CommentOut),
+]
+
+
+async def measure(model, schema, fast: bool, rounds: int):
+    settings.FAST_SERIALIZATION = fast
+    columns = serialization.select_columns(model, schema)
+    query = select(*columns) if columns else select(model)
+    query = query.order_by(model.created_at, model.id)
+    load_seconds = render_seconds = 0.0
+    for _ in range(rounds):
+        async with SessionLocal() as db:
+            started = time.perf_counter()
+            result = await db.execute(query)
+            rows = result.all() if columns else result.scalars().all()
+            loaded = time.perf_counter()
+            body = serialization.render_page(model, schema, rows, None)
+            render_seconds += time.perf_counter() - loaded
+            load_seconds += loaded - started
+    return len(rows), load_seconds / rounds, render_seconds / rounds, body
+
+async def run(args) -> int:
+    await reset_schema()
+    await generate(args.users, seed=args.seed)
+    same = True
+    print(f"{'schema':12}{'path':>6}{'rows':>8}{'load us/row':>13}{'render us/row':>15}{'total us/row':>14}")
+    for model, schema in CASES:
+        bodies = {}
+        for path in ("orm", "fast"):
+            count, load, render, bodies[path] = await measure(model, schema, path == "fast", args.rounds)
+            print(f"{schema.__name__:12}{path:>6}{count:>8}{load / count * 1e6:>13.2f}"
+                  f"{render / count * 1e6:>15.2f}{(load + render) / count * 1e6:>14.2f}")
+        if json.loads(bodies["orm"]) != json.loads(bodies["fast"]):
+            print(f"{schema.__name__}: fast output differs from the schema output")
+            same = False
+    await dispose_engines()
+    return 0 if same else 1
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-row cost of ORM + pydantic vs columns + orjson list rendering")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=3)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_args())))
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Cold start of a worker, each run in a fresh interpreter:
+#   python -m benchmarks.startup --runs 10 [--warmup 5]
+# Reports, per phase, the median and worst of: importing app.main, create_app(), the
+# startup hooks (engines, DB_POOL_WARMUP connections per engine) and the first request,
+# an authenticated batch read that goes through the middleware, auth and the database.
+
+PHASES = ("import", "create_app", "startup", "first_request", "total")
+FIRST_REQUEST = "/api/v1/users/?ids=1"
+
+
+def child() -> None:
+    # runs in the fresh interpreter; nothing from the app is imported before this point
+    started = time.perf_counter()
+    from app.main import create_app
+    imported = time.perf_counter()
+    app = create_app()
+    created = time.perf_counter()
+
+    import httpx
+
+    async def serve() -> dict:
+        await app.router.startup()
+        ready = time.perf_counter()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(FIRST_REQUEST, headers={"Authorization": f"Bearer {os.environ['BENCH_TOKEN']}"})
+        answered = time.perf_counter()
+        await app.router.shutdown()
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {FIRST_REQUEST} -> {response.status_code} {response.text}")
+        return {
+            "import": imported - started,
+            "create_app": created - imported,
+            "startup": ready - created,
+            "first_request": answered - ready,
+            "total": answered - started,
+        }
+
+    print(json.dumps(asyncio.run(serve())))
+
+async def seed() -> str:
+    from benchmarks.harness import reset_schema
+
+    from sqlalchemy import insert
+
+    from app.core.security import create_access_token, hash_password
+    from app.database import SessionLocal, dispose_engines
+    from app.models import User
+
+    await reset_schema()
+    async with SessionLocal() as db:
+        await db.execute(insert(User), [{"username": "user0", "email": "user0@example.com", "password": hash_password("password")}])
+        await db.commit()
+    await dispose_engines()
+    return create_access_token({"sub": "1"})
+
+def run(runs: int, warmup: int) -> None:
+    # the harness points DATABASE_URL at the benchmark database; children inherit it
+    token = asyncio.run(seed())
+    env = dict(os.environ, BENCH_TOKEN=token, DB_POOL_WARMUP=str(warmup))
+    samples = {phase: [] for phase in PHASES}
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child"],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        for phase, seconds in json.loads(output.splitlines()[-1]).items():
+            samples[phase].append(seconds)
+
+    print(f"{runs} cold starts, DB_POOL_WARMUP={warmup}")
+    print(f"{'phase':15}{'median ms':>12}{'max ms':>10}")
+    for phase in PHASES:
+        print(f"{phase:15}{statistics.median(samples[phase]) * 1000:>12.1f}{max(samples[phase]) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure worker cold start: import, app creation, startup, first request")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=0, help="DB_POOL_WARMUP for the measured workers")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+    else:
+        run(args.runs, args.warmup)
@@ -0,0 +1,107 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.harness import build_app, clear_caches, reset_schema
+
+import httpx
+from sqlalchemy import insert, select
+
+from app.core.instrumentation import count_statements
+from app.core.security import create_access_token, hash_password
+from app.database import SessionLocal, dispose_engines
+from app.models import Comment, Project, Task, Team, TeamMembership, User
+
+# Seeds the database at two sizes and fails if the number of SQL statements any
+# endpoint emits changes with the amount of data:
+#   python -m benchmarks.statement_counts
+
+SCALES = (1, 10)
+
+REQUESTS = [
+    ("GET", "/teams/"),
+    ("GET", "/teams/1"),
+    ("GET", "/projects/"),
+    ("GET", "/projects/1"),
+    ("GET", "/tasks/?project_id=1"),
+    ("GET", "/tasks/?project_id=1&status=to_do"),
+    ("GET", "/tasks/1"),
+    # tasks of four projects in two teams
+    ("GET", "/tasks/?ids=1,6,11,16,2"),
+    ("GET", "/users/?ids=1,2,3"),
+    ("GET", "/comments/?task_id=1"),
+    ("DELETE", "/tasks/1"),
+    ("DELETE", "/projects/2"),
+]
+
+
+async def seed(scale: int) -> None:
+    await reset_schema()
+
+    now = datetime.now(timezone.utc)
+    password = hash_password("password")
+    async with SessionLocal() as db:
+        await db.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "password": password}
+            for i in range(3 * scale)
+        ])
+        user_ids = (await db.execute(select(User.id).order_by(User.id))).scalars().all()
+        await db.execute(insert(Team), [
+            {"name": f"team{i}", "created_by": user_ids[0], "created_at": now + timedelta(seconds=i)}
+            for i in range(2 * scale)
+        ])
+        team_ids = (await db.execute(select(Team.id).order_by(Team.id))).scalars().all()
+        await db.execute(insert(TeamMembership), [
+            {"team_id": team_id, "user_id": user_id, "role": "admin" if user_id == user_ids[0] else "member"}
+            for team_id in team_ids for user_id in user_ids
+        ])
+        await db.execute(insert(Project), [
+            {"name": f"project{team_id}-{i}", "owner_id": user_ids[0], "team_id": team_id,
+             "created_at": now + timedelta(seconds=2 * team_id + i)}
+            for team_id in team_ids for i in range(2)
+        ])
+        project_ids = (await db.execute(select(Project.id).order_by(Project.id))).scalars().all()
+        await db.execute(insert(Task), [
+            {"title": f"task{project_id}-{i}", "project_id": project_id, "created_by": user_ids[0],
+             "assigned_to": user_ids[i % len(user_ids)], "created_at": now + timedelta(seconds=i)}
+            for project_id in project_ids for i in range(5 * scale)
+        ])
+        task_ids = (await db.execute(select(Task.id).order_by(Task.id))).scalars().all()
+        await db.execute(insert(Comment), [
+            {"task_id": task_id, "user_id": user_ids[i % len(user_ids)], "content": f"comment {i}",
+             "created_at": now + timedelta(seconds=i)}
+            for task_id in task_ids for i in range(scale)
+        ])
+        await db.commit()
+
+async def measure(scale: int) -> dict:
+    await seed(scale)
+    token = create_access_token({"sub": "1"})
+    counts = {}
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for method, url in REQUESTS:
+            # start every request cold so cached lookups and responses do not skew the counts
+            await clear_caches()
+            with count_statements() as counter:
+                response = await client.request(method, url, headers={"Authorization": f"Bearer {token}"})
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} -> {response.status_code} {response.text}")
+            counts[(method, url)] = counter.count
+    return counts
+
+async def run() -> bool:
+    results = [await measure(scale) for scale in SCALES]
+    await dispose_engines()
+    stable = True
+    print(f"{'endpoint':45}" + "".join(f"{'x' + str(scale):>8}" for scale in SCALES))
+    for key in REQUESTS:
+        counts = [result[key] for result in results]
+        ok = len(set(counts)) == 1
+        stable = stable and ok
+        print(f"{' '.join(key):45}" + "".join(f"{count:>8}" for count in counts) + ("" if ok else "  CHANGED"))
+    return stable
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run()) else 1)
@@ -0,0 +1,37 @@
+"""indexes for the hot query shapes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tasks_project_status_created_at', 'tasks', ['project_id', 'status', 'created_at', 'id'])
+    op.create_index('ix_tasks_project_created_at', 'tasks', ['project_id', 'created_at', 'id'])
+    op.create_index('ix_tasks_assigned_to', 'tasks', ['assigned_to'])
+    op.create_index('ix_tasks_due_date', 'tasks', ['due_date'])
+    op.create_index('ix_comments_task_created_at', 'comments', ['task_id', 'created_at', 'id'])
+    op.create_index('ix_projects_owner_id', 'projects', ['owner_id'])
+    op.create_index('ix_projects_team_id', 'projects', ['team_id'])
+    op.create_index('ix_teams_created_at', 'teams', ['created_at', 'id'])
+    op.create_index('ix_team_memberships_team_id', 'team_memberships', ['team_id'])
+
+
+def downgrade():
+    op.drop_index('ix_team_memberships_team_id', 'team_memberships')
+    op.drop_index('ix_teams_created_at', 'teams')
+    op.drop_index('ix_projects_team_id', 'projects')
+    op.drop_index('ix_projects_owner_id', 'projects')
+    op.drop_index('ix_comments_task_created_at', 'comments')
+    op.drop_index('ix_tasks_due_date', 'tasks')
+    op.drop_index('ix_tasks_assigned_to', 'tasks')
+    op.drop_index('ix_tasks_project_created_at', 'tasks')
+    op.drop_index('ix_tasks_project_status_created_at', 'tasks')
@@ -0,0 +1,40 @@
+"""project task summary counts
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+TASK_STATUS = sa.Enum('TO_DO', 'IN_PROGRESS', 'DONE', name='taskstatus').with_variant(
+    postgresql.ENUM('TO_DO', 'IN_PROGRESS', 'DONE', name='taskstatus', create_type=False), 'postgresql'
+)
+
+
+def upgrade():
+    op.create_table(
+        'project_task_counts',
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('status', TASK_STATUS, primary_key=True),
+        sa.Column('assigned_to', sa.Integer(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+    )
+    op.create_index('ix_tasks_project_due_date', 'tasks', ['project_id', 'due_date'])
+    op.execute(
+        "INSERT INTO project_task_counts (project_id, status, assigned_to, count) "
+        "SELECT project_id, status, coalesce(assigned_to, 0), count(*) FROM tasks "
+        "GROUP BY project_id, status, coalesce(assigned_to, 0)"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_tasks_project_due_date', 'tasks')
+    op.drop_table('project_task_counts')
@@ -0,0 +1,28 @@
+"""row versions for ETags, task updated_at
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('tasks', 'projects', 'teams'):
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('tasks', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('tasks') as batch:
+        batch.drop_column('updated_at')
+    for table in ('teams', 'projects', 'tasks'):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column('version')
@@ -0,0 +1,62 @@
+"""archive tables for done tasks and their comments
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# the enum types already exist (0001), Postgres must not create them again
+TASK_STATUS = sa.Enum('TO_DO', 'IN_PROGRESS', 'DONE', name='taskstatus').with_variant(
+    postgresql.ENUM('TO_DO', 'IN_PROGRESS', 'DONE', name='taskstatus', create_type=False), 'postgresql'
+)
+TASK_PRIORITY = sa.Enum('LOW', 'MEDIUM', 'HIGH', name='taskpriority').with_variant(
+    postgresql.ENUM('LOW', 'MEDIUM', 'HIGH', name='taskpriority', create_type=False), 'postgresql'
+)
+
+
+def upgrade():
+    op.create_table(
+        'tasks_archive',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.String(500)),
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('assigned_to', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('status', TASK_STATUS),
+        sa.Column('priority', TASK_PRIORITY),
+        sa.Column('due_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_tasks_archive_project_created_at', 'tasks_archive', ['project_id', 'created_at', 'id'])
+    op.create_table(
+        'comments_archive',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('task_id', sa.Integer(), sa.ForeignKey('tasks_archive.id'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('content', sa.String(500), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_comments_archive_task_created_at', 'comments_archive', ['task_id', 'created_at', 'id'])
+    # the archiver looks for done tasks by age
+    op.create_index('ix_tasks_status_updated_at', 'tasks', ['status', 'updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_tasks_status_updated_at', 'tasks')
+    op.drop_index('ix_comments_archive_task_created_at', 'comments_archive')
+    op.drop_table('comments_archive')
+    op.drop_index('ix_tasks_archive_project_created_at', 'tasks_archive')
+    op.drop_table('tasks_archive')
@@ -0,0 +1,28 @@
+"""due-date scheduler flags on tasks
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # constant defaults: Postgres adds these without rewriting the tables
+    for table in ('tasks', 'tasks_archive'):
+        op.add_column(table, sa.Column('due_reminded', sa.Boolean(), nullable=False, server_default=sa.false()))
+        op.add_column(table, sa.Column('overdue', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    for table in ('tasks_archive', 'tasks'):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column('overdue')
+            batch.drop_column('due_reminded')
@@ -0,0 +1,35 @@
+"""project activity log
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'project_activity',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('actor_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(50), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=True),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        'ix_project_activity_project_created_at', 'project_activity', ['project_id', 'created_at', 'id']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_project_activity_project_created_at', 'project_activity')
+    op.drop_table('project_activity')
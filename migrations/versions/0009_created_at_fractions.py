@@ -0,0 +1,28 @@
+"""store created_at with fractional seconds on SQLite
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # rows from the CURRENT_TIMESTAMP default are 'YYYY-MM-DD HH:MM:SS'; give them the
+    # '.ffffff' every bound datetime has, so keyset cursors compare equal to them
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in ('tasks', 'projects', 'comments', 'teams'):
+        op.execute(
+            f"UPDATE {table} SET created_at = created_at || '.000000' WHERE length(created_at) = 19"
+        )
+
+
+def downgrade():
+    pass
@@ -0,0 +1,25 @@
+"""page the activity log by id
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('ix_project_activity_project_created_at', 'project_activity')
+    op.create_index('ix_project_activity_project_id', 'project_activity', ['project_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_project_activity_project_id', 'project_activity')
+    op.create_index(
+        'ix_project_activity_project_created_at', 'project_activity', ['project_id', 'created_at', 'id']
+    )